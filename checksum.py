@@ -0,0 +1,340 @@
+import hashlib
+import mmap
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+try:
+    import xxhash
+except ImportError:  # xxhash is optional; xxh3_128 is unavailable without it
+    xxhash = None
+
+try:
+    import blake3
+except ImportError:  # blake3 is optional; the blake3 algorithm is unavailable without it
+    blake3 = None
+
+# Files at least this large are hashed through a read-only memory map;
+# smaller ones are read in a single call
+MMAP_THRESHOLD = 1 << 20
+
+# Size of the per-thread buffer small and unmappable files are read through
+READ_BUFFER_SIZE = 1 << 20
+
+_buffers = threading.local()
+
+def _read_buffer() -> memoryview:
+    """Get the calling thread's reusable read buffer."""
+    view = getattr(_buffers, "view", None)
+    if view is None:
+        view = _buffers.view = memoryview(bytearray(READ_BUFFER_SIZE))
+    return view
+
+def _update_from(digest: Any, f: Any) -> None:
+    """Feed the rest of an unbuffered file into digest through the thread's buffer."""
+    view = _read_buffer()
+    while True:
+        n = f.readinto(view)
+        if not n:
+            break
+        digest.update(view[:n])
+
+# Content hashes are only used for deduplication, so fast non-cryptographic
+# digests are fine. Every algorithm yields a hex digest.
+HASH_ALGORITHMS: Dict[str, Callable[[], Any]] = {
+    "md5": hashlib.md5,
+    "blake2b": lambda: hashlib.blake2b(digest_size=16),
+    # OpenSSL uses SHA-NI / ARMv8 SHA instructions where the CPU has them
+    "sha256": hashlib.sha256,
+}
+if xxhash is not None:
+    HASH_ALGORITHMS["xxh3_128"] = xxhash.xxh3_128
+if blake3 is not None:
+    # SIMD across 1 KiB chunks, and multithreaded on large inputs
+    HASH_ALGORITHMS["blake3"] = lambda: blake3.blake3(max_threads=blake3.blake3.AUTO)
+
+# Algorithm used for new galleries; existing ones keep what they were built
+# with. Set HASH_ALGO to compare algorithms on the deployment hardware.
+DEFAULT_ALGORITHM = os.environ.get("HASH_ALGO", "blake2b")
+if DEFAULT_ALGORITHM not in HASH_ALGORITHMS:
+    raise ValueError(f"Unsupported HASH_ALGO: {DEFAULT_ALGORITHM}")
+
+def hash_file(file_path: str, algorithm: str = "md5") -> str:
+    """
+    Compute the content hash of a file.
+
+    Large files are memory-mapped and handed to the hash in one call, so the
+    page cache feeds the C hash loop directly (with the GIL released)
+    instead of Python looping over small reads.
+
+    Args:
+        file_path: Path to the file
+        algorithm: Name of an entry in HASH_ALGORITHMS
+
+    Returns:
+        Hex digest
+
+    Raises:
+        ValueError: If the algorithm is unknown or its package isn't installed
+        OSError: If the file cannot be read
+    """
+    try:
+        new_hash = HASH_ALGORITHMS[algorithm]
+    except KeyError:
+        raise ValueError(f"Unsupported hash algorithm: {algorithm}")
+
+    # Unbuffered: reads land straight in the reusable buffer instead of
+    # being copied through a BufferedReader and a fresh bytes object
+    with open(file_path, "rb", buffering=0) as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < MMAP_THRESHOLD:
+            digest = new_hash()
+            _update_from(digest, f)
+            return digest.hexdigest()
+
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if hasattr(mm, "madvise"):
+                    # Let the kernel read ahead aggressively and drop pages behind
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                digest = new_hash()
+                digest.update(mm)
+                return digest.hexdigest()
+        except (OSError, ValueError):
+            # Not mappable (special files, some network filesystems)
+            f.seek(0)
+
+        digest = new_hash()
+        _update_from(digest, f)
+        return digest.hexdigest()
+
+def copy_and_hash(src_path: str, dst_path: str, algorithm: str = "md5") -> str:
+    """
+    Copy a file, preserving its metadata as shutil.copy2 does, and hash it.
+
+    The copy is done in the kernel with copy_file_range where available,
+    which filesystems with reflinks (btrfs, XFS) turn into a metadata-only
+    clone; the source is then hashed from the page cache the copy just
+    filled. Elsewhere the file is streamed once through a user-space
+    buffer that feeds both the hash and the destination.
+
+    Args:
+        src_path: Path to the file to copy
+        dst_path: Destination path; an existing file is overwritten
+        algorithm: Name of an entry in HASH_ALGORITHMS
+
+    Returns:
+        Hex digest of the copied contents
+
+    Raises:
+        ValueError: If the algorithm is unknown or its package isn't installed
+        OSError: If the file cannot be read or the destination written
+    """
+    try:
+        new_hash = HASH_ALGORITHMS[algorithm]
+    except KeyError:
+        raise ValueError(f"Unsupported hash algorithm: {algorithm}")
+
+    with open(src_path, "rb") as src, open(dst_path, "wb") as dst:
+        remaining = os.fstat(src.fileno()).st_size
+        copied_in_kernel = False
+        if hasattr(os, "copy_file_range") and remaining:
+            try:
+                while remaining > 0:
+                    sent = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+                    if sent == 0:
+                        break
+                    remaining -= sent
+                copied_in_kernel = remaining <= 0
+            except OSError:
+                # Cross-device on older kernels, or unsupported filesystem
+                pass
+
+        if copied_in_kernel:
+            digest = None
+        else:
+            src.seek(0)
+            dst.seek(0)
+            dst.truncate()
+            digest = new_hash()
+            view = _read_buffer()
+            while True:
+                n = src.readinto(view)
+                if not n:
+                    break
+                digest.update(view[:n])
+                dst.write(view[:n])
+
+    shutil.copystat(src_path, dst_path)
+    if digest is None:
+        return hash_file(src_path, algorithm)
+    return digest.hexdigest()
+
+def prefetch_file(file_path: str) -> None:
+    """
+    Ask the kernel to start reading a file into the page cache in the background.
+
+    Issued for files queued for hashing, so their reads overlap with the
+    hashing of earlier files instead of each worker stalling on I/O in
+    turn. Best effort: does nothing where posix_fadvise is unavailable or
+    the file can't be opened.
+
+    Args:
+        file_path: Path to the file
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        fd = os.open(file_path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+class HashCache:
+    """
+    Memoizes file hashes for as long as the files stay unchanged.
+
+    Entries are keyed by path and algorithm and validated against the file's
+    size and modification time, so a file touched since it was hashed is
+    simply hashed again. The least recently used entries are evicted once
+    max_entries is reached.
+
+    The cache is memory-only and safe to share between hashing threads.
+    To keep hashes across restarts, preload() entries read from a store
+    such as DBManager.get_cached_hashes() before hashing, and write back
+    the ones hash_file_entry() reports as newly computed.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of hashes to keep in memory
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[int, int, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hash_file(self, file_path: str, algorithm: str = "md5") -> str:
+        """
+        Get the content hash of a file, computing it only if not cached.
+
+        Args:
+            file_path: Path to the file
+            algorithm: Name of an entry in HASH_ALGORITHMS
+
+        Returns:
+            Hex digest
+
+        Raises:
+            ValueError: If the algorithm is unknown or its package isn't installed
+            OSError: If the file cannot be read
+        """
+        return self.hash_file_entry(file_path, algorithm)[0]
+
+    def hash_file_entry(self, file_path: str,
+                        algorithm: str = "md5") -> Tuple[str, Optional[Tuple[int, int]]]:
+        """
+        Get the content hash of a file, and whether it had to be computed.
+
+        Args:
+            file_path: Path to the file
+            algorithm: Name of an entry in HASH_ALGORITHMS
+
+        Returns:
+            Tuple of (hex digest, (size, mtime_ns) the file was hashed at),
+            the second being None if the digest came from the cache
+
+        Raises:
+            ValueError: If the algorithm is unknown or its package isn't installed
+            OSError: If the file cannot be read
+        """
+        st = os.stat(file_path)
+        key = (os.path.abspath(file_path), algorithm)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+                self._entries.move_to_end(key)
+                return entry[2], None
+
+        digest = hash_file(file_path, algorithm)
+        with self._lock:
+            self._put(key, (st.st_size, st.st_mtime_ns, digest))
+        return digest, (st.st_size, st.st_mtime_ns)
+
+    def preload(self, algorithm: str, entries: Dict[str, Tuple[int, int, str]]) -> None:
+        """
+        Seed the cache with previously computed hashes.
+
+        Entries are still checked against the files when looked up, so
+        stale ones are harmless.
+
+        Args:
+            algorithm: Hash algorithm the digests were computed with
+            entries: Mapping of absolute path to (size, mtime_ns, digest)
+        """
+        with self._lock:
+            for path, entry in entries.items():
+                self._put((path, algorithm), entry)
+
+    def _put(self, key: Tuple[str, str], entry: Tuple[int, int, str]) -> None:
+        """Add or refresh an entry, evicting the oldest; the lock must be held."""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached hashes."""
+        with self._lock:
+            self._entries.clear()
+
+def md5_file(file_path: str) -> str:
+    """
+    Compute the MD5 checksum of a file.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        Hex MD5 digest
+    """
+    return hash_file(file_path, "md5")
+
+def hash_files(file_paths: List[str], algorithm: str = "md5",
+               max_workers: Optional[int] = None) -> Iterator[Tuple[int, Union[str, Exception]]]:
+    """
+    Hash several files in parallel.
+
+    hashlib releases the GIL while hashing, so a thread pool keeps every
+    core busy. Results are yielded as files finish, which lets callers
+    drive a progress display; closing the iterator early cancels the files
+    not yet started.
+
+    Args:
+        file_paths: Paths of the files to hash
+        algorithm: Name of an entry in HASH_ALGORITHMS
+        max_workers: Number of hashing threads (default: one per CPU)
+
+    Yields:
+        Tuples of (index into file_paths, hex digest); if a file cannot be
+        hashed the exception is yielded in place of the digest
+    """
+    executor = ThreadPoolExecutor(max_workers=max_workers or os.cpu_count())
+    try:
+        futures = {executor.submit(hash_file, path, algorithm): index
+                   for index, path in enumerate(file_paths)}
+        for future in as_completed(futures):
+            error = future.exception()
+            yield futures[future], error if error is not None else future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
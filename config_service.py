@@ -0,0 +1,85 @@
+import json
+import os
+import tempfile
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib parser is used without it
+    orjson = None
+
+CONFIG_FILE = "config.json"
+
+# (path, st_mtime_ns, parsed config) of the last file read
+_cache: Optional[Tuple[str, int, Dict[str, Any]]] = None
+
+def _load(path: str) -> Optional[Dict[str, Any]]:
+    """Get the parsed config at path, reparsing only if the file changed."""
+    global _cache
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+    if _cache is None or _cache[0] != path or _cache[1] != mtime:
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            config = orjson.loads(data) if orjson is not None else json.loads(data)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(config, dict):
+            return None
+        _cache = (path, mtime, config)
+    return _cache[2]
+
+def read_config(path: str = CONFIG_FILE) -> Dict[str, Any]:
+    """
+    Read the application configuration.
+
+    The parsed file is kept at module level and reused until the file's
+    modification time changes, so callers can read the config wherever
+    they need it without reparsing it each time.
+
+    Args:
+        path: Path to the configuration file
+
+    Returns:
+        A copy of the configuration; empty if the file is missing or invalid
+    """
+    return dict(_load(path) or {})
+
+def write_config(config: Dict[str, Any], path: str = CONFIG_FILE) -> None:
+    """
+    Write the application configuration and refresh the cached copy.
+
+    Nothing is written if the file still holds exactly this configuration.
+    Otherwise the new contents go to a temporary file that then replaces
+    the old one, so a crash mid-save never leaves a truncated config.
+
+    Args:
+        config: Configuration to store
+        path: Path to the configuration file
+
+    Raises:
+        OSError: If the file cannot be written
+    """
+    global _cache
+    if _load(path) == config:
+        return
+
+    fd, tmp_path = tempfile.mkstemp(prefix=".config-", suffix=".tmp",
+                                    dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(config, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    _cache = (path, os.stat(path).st_mtime_ns, dict(config))
@@ -1,8 +1,555 @@
+import os
 import sqlite3
 import json
-from typing import List, Dict, Any, Tuple, Optional
+import threading
+from typing import List, Dict, Any, Tuple, Optional, Iterator, Sequence, Set
+from array import array
 from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
 from datetime import datetime
+from functools import lru_cache
+from itertools import groupby
+from operator import itemgetter
+
+from checksum import DEFAULT_ALGORITHM
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
+# Stay well below SQLite's limit on bound parameters per statement
+_MAX_IN_PARAMS = 500
+
+# Per-connection tuning, applied every time a connection is opened
+_CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA foreign_keys=ON",
+)
+
+# Bumped whenever the schema changes; stored in PRAGMA user_version.
+#   1: images.md5_checksum stores the raw digest bytes as a BLOB
+#   2: width/height/taken_at/camera columns copied out of metadata
+#   3: file_size recorded so scans can skip files of unknown sizes
+_SCHEMA_VERSION = 3
+
+# Images table, also used to rebuild the table during migrations
+_IMAGES_TABLE_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        md5_checksum BLOB UNIQUE,
+        reference_code TEXT,
+        project_path TEXT,
+        metadata TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        width INTEGER,
+        height INTEGER,
+        taken_at TIMESTAMP,
+        camera TEXT,
+        file_size INTEGER
+    )
+"""
+
+# Frequently displayed/filtered metadata fields, kept in real columns. The
+# full dictionary stays in the metadata JSON; these are typed copies.
+_METADATA_COLUMNS = ('width', 'height', 'taken_at', 'camera')
+
+# Query text lives at module level so every call passes the same string
+# object and hits the connection's prepared statement cache.
+
+# Columns of the images table returned by the read methods, in SELECT order
+_IMAGE_COLUMNS = (
+    'id', 'md5_checksum', 'reference_code', 'project_path',
+    'metadata', 'created_at', 'updated_at',
+) + _METADATA_COLUMNS
+_IMAGE_SELECT = ", ".join(f"i.{column}" for column in _IMAGE_COLUMNS)
+_METADATA_INDEX = _IMAGE_COLUMNS.index('metadata')
+# Joined columns follow the image columns
+_EXTRA_INDEX = len(_IMAGE_COLUMNS)
+
+_SQL_INSERT_IMAGE = """
+    INSERT INTO images
+    (md5_checksum, reference_code, metadata, created_at, updated_at,
+     width, height, taken_at, camera, file_size)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+_SQL_INSERT_IMAGE_WITH_ID = """
+    INSERT INTO images
+    (id, md5_checksum, reference_code, metadata, created_at, updated_at,
+     width, height, taken_at, camera, file_size)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+_SQL_NEXT_IMAGE_ID = """
+    SELECT MAX(
+        COALESCE((SELECT MAX(id) FROM images), 0),
+        COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'images'), 0)
+    ) + 1
+"""
+_SQL_INSERT_LOCATION = """
+    INSERT INTO image_locations (image_id, file_path, created_at)
+    VALUES (?, ?, ?)
+"""
+_SQL_INSERT_LOCATION_VERIFIED = """
+    INSERT INTO image_locations (image_id, file_path, is_verified, created_at)
+    VALUES (?, ?, ?, ?)
+"""
+_SQL_GET_BY_MD5 = f"""
+    SELECT {_IMAGE_SELECT}, il.file_path
+    FROM images i
+    LEFT JOIN image_locations il ON i.id = il.image_id
+    WHERE i.md5_checksum = ?
+    ORDER BY il.id
+"""
+_SQL_SET_FILE_HASH = """
+    INSERT OR REPLACE INTO file_hashes (path, algorithm, size, mtime_ns, digest)
+    VALUES (?, ?, ?, ?, ?)
+"""
+_SQL_GET_FILE_METADATA = """
+    SELECT metadata FROM file_metadata
+    WHERE path = ? AND mtime_ns = ? AND size = ?
+"""
+_SQL_SET_FILE_METADATA = """
+    INSERT OR REPLACE INTO file_metadata (path, mtime_ns, size, metadata)
+    VALUES (?, ?, ?, ?)
+"""
+_SQL_VERIFY_LOCATION = """
+    UPDATE image_locations
+    SET is_verified = 1
+    WHERE image_id = ? AND file_path = ?
+"""
+_SQL_ALL_LOCATIONS = """
+    SELECT il.image_id, il.file_path
+    FROM image_locations il
+    JOIN images i ON i.id = il.image_id
+"""
+_SQL_DELETE_LOCATION = """
+    DELETE FROM image_locations
+    WHERE image_id = ? AND file_path = ?
+"""
+_SQL_SET_PROJECT_PATH = """
+    UPDATE images
+    SET project_path = ?, updated_at = ?
+    WHERE id = ?
+"""
+_SQL_INSERT_TAG = """
+    INSERT OR IGNORE INTO tags (name, created_at)
+    VALUES (?, ?)
+"""
+_SQL_GET_TAG_ID = "SELECT id FROM tags WHERE name = ?"
+# The no-op DO UPDATE makes RETURNING yield the existing row on conflict
+_SQL_UPSERT_TAG = """
+    INSERT INTO tags (name, created_at)
+    VALUES (?, ?)
+    ON CONFLICT(name) DO UPDATE SET name = excluded.name
+    RETURNING id
+"""
+_SQL_INSERT_IMAGE_TAG = """
+    INSERT OR IGNORE INTO image_tags (image_id, tag_id, created_at)
+    VALUES (?, ?, ?)
+"""
+_SQL_GET_TAGS_FOR_IMAGE = """
+    SELECT t.name
+    FROM tags t
+    JOIN image_tags it ON t.id = it.tag_id
+    WHERE it.image_id = ?
+    ORDER BY t.name
+"""
+_SQL_GET_IMAGES_BY_TAG = f"""
+    SELECT {_IMAGE_SELECT}
+    FROM tags t
+    JOIN image_tags it ON it.tag_id = t.id
+    JOIN images i ON i.id = it.image_id
+    WHERE t.name = ?
+    ORDER BY i.created_at DESC
+"""
+_SQL_DELETE_IMAGE_TAGS = "DELETE FROM image_tags WHERE image_id = ?"
+_SQL_DELETE_IMAGE_TAG = "DELETE FROM image_tags WHERE image_id = ? AND tag_id = ?"
+_SQL_UPDATE_METADATA = """
+    UPDATE images
+    SET metadata = ?, updated_at = ?, width = ?, height = ?, taken_at = ?, camera = ?
+    WHERE id = ? AND metadata IS NOT ?
+"""
+_SQL_DELETE_IMAGE = "DELETE FROM images WHERE id = ?"
+_SQL_STATS = """
+    SELECT (SELECT COUNT(*) FROM images) AS total,
+           (SELECT COUNT(DISTINCT image_id) FROM image_tags) AS tagged
+"""
+# One row per image with exactly the columns the gallery table shows, with
+# the same tag order as _SQL_ALL_IMAGES_WITH_TAGS
+_SQL_IMAGE_TABLE_SELECT = """
+    SELECT i.id,
+           COALESCE(NULLIF(i.project_path, ''),
+                    (SELECT il.file_path FROM image_locations il
+                     WHERE il.image_id = i.id ORDER BY il.id LIMIT 1),
+                    '') AS file_path,
+           COALESCE(i.reference_code, '') AS reference_code,
+           COALESCE((SELECT GROUP_CONCAT(name, ', ')
+                     FROM (SELECT t.name FROM image_tags it
+                           JOIN tags t ON t.id = it.tag_id
+                           WHERE it.image_id = i.id ORDER BY t.id)),
+                    '') AS tag_names
+    FROM images i
+"""
+_SQL_IMAGE_TABLE_COLUMNS = _SQL_IMAGE_TABLE_SELECT + "ORDER BY i.created_at DESC, i.id"
+# One row per (image, location, tag); rows of an image are adjacent so
+# they can be bucketed while streaming the cursor.
+_SQL_ALL_IMAGES_WITH_TAGS = f"""
+    SELECT {_IMAGE_SELECT}, il.file_path, t.id, t.name
+    FROM images i
+    LEFT JOIN image_locations il ON i.id = il.image_id
+    LEFT JOIN image_tags it ON i.id = it.image_id
+    LEFT JOIN tags t ON it.tag_id = t.id
+    ORDER BY i.created_at DESC, i.id, il.id, t.id
+"""
+_SQL_IMAGE_WITH_TAGS = f"""
+    SELECT {_IMAGE_SELECT}, il.file_path, t.id, t.name
+    FROM images i
+    LEFT JOIN image_locations il ON i.id = il.image_id
+    LEFT JOIN image_tags it ON i.id = it.image_id
+    LEFT JOIN tags t ON it.tag_id = t.id
+    WHERE i.id = ?
+    ORDER BY il.id, t.id
+"""
+_SQL_SEARCH_ALL = f"""
+    SELECT DISTINCT {_IMAGE_SELECT} FROM images i
+    LEFT JOIN image_locations il ON i.id = il.image_id
+    LEFT JOIN image_tags it ON i.id = it.image_id
+    LEFT JOIN tags t ON it.tag_id = t.id
+    WHERE il.file_path LIKE ?
+    OR t.name LIKE ?
+    OR i.metadata LIKE ?
+"""
+_SQL_SEARCH_FILENAME = f"""
+    SELECT DISTINCT {_IMAGE_SELECT} FROM images i
+    JOIN image_locations il ON i.id = il.image_id
+    WHERE il.file_path LIKE ?
+"""
+_SQL_SEARCH_TAGS = f"""
+    SELECT DISTINCT {_IMAGE_SELECT} FROM images i
+    JOIN image_tags it ON i.id = it.image_id
+    JOIN tags t ON it.tag_id = t.id
+    WHERE t.name LIKE ?
+"""
+_SQL_SEARCH_METADATA = f"""
+    SELECT {_IMAGE_SELECT} FROM images i
+    WHERE i.metadata LIKE ?
+"""
+_SQL_SEARCH_FTS = f"""
+    SELECT {_IMAGE_SELECT} FROM images i
+    JOIN images_fts f ON f.rowid = i.id
+    WHERE images_fts MATCH ?
+"""
+
+# Full-text index over each image's file paths, tag names and metadata JSON.
+# The trigram tokenizer gives the same case-insensitive substring semantics
+# as LIKE '%query%', but answers from the index. Rows use the image ID as
+# rowid and are kept in sync by triggers.
+_FTS_SCHEMA = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS images_fts
+    USING fts5(file_path, tag_names, metadata, tokenize='trigram')
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS images_fts_insert AFTER INSERT ON images BEGIN
+        INSERT INTO images_fts (rowid, file_path, tag_names, metadata)
+        VALUES (NEW.id, '', '', NEW.metadata);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS images_fts_update AFTER UPDATE OF metadata ON images BEGIN
+        UPDATE images_fts SET metadata = NEW.metadata WHERE rowid = NEW.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS images_fts_delete AFTER DELETE ON images BEGIN
+        DELETE FROM images_fts WHERE rowid = OLD.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS image_locations_fts_insert AFTER INSERT ON image_locations BEGIN
+        UPDATE images_fts SET file_path = (
+            SELECT GROUP_CONCAT(file_path, char(10)) FROM image_locations
+            WHERE image_id = NEW.image_id
+        ) WHERE rowid = NEW.image_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS image_locations_fts_delete AFTER DELETE ON image_locations BEGIN
+        UPDATE images_fts SET file_path = COALESCE((
+            SELECT GROUP_CONCAT(file_path, char(10)) FROM image_locations
+            WHERE image_id = OLD.image_id
+        ), '') WHERE rowid = OLD.image_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS image_tags_fts_insert AFTER INSERT ON image_tags BEGIN
+        UPDATE images_fts SET tag_names = (
+            SELECT GROUP_CONCAT(t.name, char(10)) FROM image_tags it
+            JOIN tags t ON t.id = it.tag_id
+            WHERE it.image_id = NEW.image_id
+        ) WHERE rowid = NEW.image_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS image_tags_fts_delete AFTER DELETE ON image_tags BEGIN
+        UPDATE images_fts SET tag_names = COALESCE((
+            SELECT GROUP_CONCAT(t.name, char(10)) FROM image_tags it
+            JOIN tags t ON t.id = it.tag_id
+            WHERE it.image_id = OLD.image_id
+        ), '') WHERE rowid = OLD.image_id;
+    END
+    """,
+)
+_SQL_FTS_BACKFILL = """
+    INSERT INTO images_fts (rowid, file_path, tag_names, metadata)
+    SELECT i.id,
+           COALESCE((SELECT GROUP_CONCAT(il.file_path, char(10)) FROM image_locations il
+                     WHERE il.image_id = i.id), ''),
+           COALESCE((SELECT GROUP_CONCAT(t.name, char(10)) FROM image_tags it
+                     JOIN tags t ON t.id = it.tag_id
+                     WHERE it.image_id = i.id), ''),
+           i.metadata
+    FROM images i
+"""
+
+# Shortest query the trigram tokenizer can match
+_FTS_MIN_QUERY_LENGTH = 3
+
+# FTS column filters for the search types answered from the index
+_FTS_SEARCH_COLUMNS = {
+    'all': None,
+    'filename': 'file_path',
+    'tags': 'tag_names',
+    'metadata': 'metadata',
+}
+
+# RETURNING clauses need SQLite 3.35+
+_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+# Large enough to keep every statement above prepared on each connection
+_CACHED_STATEMENTS = 256
+
+# Rows pulled from SQLite per fetchmany() call when streaming results
+_FETCH_BATCH_SIZE = 512
+
+# Worker threads serving the async_* read methods
+_READ_WORKERS = 2
+
+def _dumps_metadata(metadata: Optional[Dict]) -> str:
+    """
+    Serialize a metadata dictionary for the metadata column.
+
+    Args:
+        metadata: Metadata dictionary, or None for an empty one
+
+    Returns:
+        JSON text
+    """
+    if orjson is not None:
+        # Non-string keys are stringified like json.dumps does
+        return orjson.dumps(metadata or {}, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(metadata or {})
+
+def _loads_metadata(value: Optional[str]) -> Dict:
+    """
+    Deserialize the metadata column.
+
+    Args:
+        value: JSON text stored in the metadata column
+
+    Returns:
+        Metadata dictionary
+    """
+    if not value:
+        return {}
+    if orjson is not None:
+        return orjson.loads(value)
+    return json.loads(value)
+
+def _iter_rows(cursor: sqlite3.Cursor) -> Iterator[sqlite3.Row]:
+    """
+    Stream a cursor's result set in fetchmany() batches.
+
+    Args:
+        cursor: Cursor with an executed query
+
+    Yields:
+        Result rows
+    """
+    cursor.arraysize = _FETCH_BATCH_SIZE
+    while rows := cursor.fetchmany():
+        yield from rows
+
+def _to_int(value: Any) -> Optional[int]:
+    """
+    Coerce a metadata value to an int, or None if it isn't numeric.
+
+    Args:
+        value: Metadata value
+
+    Returns:
+        Integer value or None
+    """
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def _metadata_columns(metadata: Optional[Dict]) -> Tuple[Any, Any, Any, Any]:
+    """
+    Pick the values of the _METADATA_COLUMNS out of a metadata dictionary.
+
+    Explicit keys win; otherwise the values are derived from what
+    ImageModel extracts (PIL 'size' and EXIF DateTime*/Make/Model tags).
+
+    Args:
+        metadata: Metadata dictionary, may be None
+
+    Returns:
+        Tuple of (width, height, taken_at, camera); missing values are None
+    """
+    if not metadata:
+        return None, None, None, None
+
+    width, height = metadata.get('width'), metadata.get('height')
+    size = metadata.get('size')
+    if (width is None or height is None) and isinstance(size, (list, tuple)) and len(size) == 2:
+        width, height = size
+
+    taken_at = (metadata.get('taken_at') or metadata.get('DateTimeOriginal')
+                or metadata.get('DateTime'))
+    if taken_at is not None:
+        taken_at = str(taken_at).strip()
+        try:
+            # EXIF writes "YYYY:MM:DD HH:MM:SS"
+            taken_at = datetime.strptime(taken_at, "%Y:%m:%d %H:%M:%S").isoformat()
+        except ValueError:
+            pass
+        taken_at = taken_at or None
+
+    camera = metadata.get('camera')
+    if camera is None:
+        camera = " ".join(str(metadata[key]).strip() for key in ('Make', 'Model')
+                          if metadata.get(key)) or None
+
+    return _to_int(width), _to_int(height), taken_at, camera
+
+def _md5_to_blob(md5_checksum: Any) -> Any:
+    """
+    Convert a hex checksum to the raw digest bytes stored in the database.
+
+    The digest may come from any supported algorithm, so its length varies
+    (16 bytes for MD5, 32 for sha256 or blake3). Also registered as an SQL
+    function to convert legacy TEXT checksums.
+
+    Values that aren't hex strings are returned unchanged and stay TEXT in
+    the column. Every write and lookup goes through this function, so a
+    given checksum is always stored and queried as the same type, and an
+    equality lookup for it still matches.
+
+    Args:
+        md5_checksum: Hex digest
+
+    Returns:
+        Raw digest bytes, or the value unchanged if it is not a hex string
+    """
+    if isinstance(md5_checksum, str):
+        try:
+            return bytes.fromhex(md5_checksum)
+        except ValueError:
+            pass
+    return md5_checksum
+
+def _md5_to_hex(value: Any) -> Any:
+    """
+    Convert a stored checksum back to the hex string used by callers.
+
+    Values that were not valid hex when written are stored unchanged.
+
+    Args:
+        value: Value of the md5_checksum column
+
+    Returns:
+        Hex digest
+    """
+    if isinstance(value, bytes):
+        return value.hex()
+    return value
+
+def _file_size(file_path: str) -> Optional[int]:
+    """
+    Get the size of a file, or None if it cannot be stat'ed.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        Size in bytes, or None
+    """
+    try:
+        return os.stat(file_path).st_size
+    except OSError:
+        return None
+
+def _image_from_row(row: sqlite3.Row) -> Dict[str, Any]:
+    """
+    Build an image dictionary from the leading _IMAGE_COLUMNS of a row.
+
+    Args:
+        row: Result row starting with the _IMAGE_SELECT columns
+
+    Returns:
+        Image dictionary with decoded metadata
+    """
+    image = dict(zip(_IMAGE_COLUMNS, row))
+    image['md5_checksum'] = _md5_to_hex(image['md5_checksum'])
+    image['metadata'] = _loads_metadata(row[_METADATA_INDEX])
+    return image
+
+def _image_with_tags_from_rows(rows: List[sqlite3.Row]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    Build one image and its tags from its rows of the images/locations/tags join.
+
+    Args:
+        rows: Every row of the join for the image, with the location path,
+            tag ID and tag name following the image columns
+
+    Returns:
+        Tuple of (image_info, tags)
+    """
+    location_index, tag_id_index, tag_name_index = range(_EXTRA_INDEX, _EXTRA_INDEX + 3)
+    image = _image_from_row(rows[0])
+    # The two joins multiply locations by tags; dedupe in order
+    image['locations'] = list(dict.fromkeys(
+        row[location_index] for row in rows if row[location_index] is not None))
+    tags = [{'id': tag_id, 'name': name}
+            for tag_id, name in dict.fromkeys(
+                (row[tag_id_index], row[tag_name_index])
+                for row in rows if row[tag_id_index] is not None)]
+    return image, tags
+
+@lru_cache(maxsize=None)
+def _enable_wal(db_path: str) -> None:
+    """
+    Switch a database file to write-ahead logging.
+
+    The journal mode is persistent, so this only needs to run once per
+    database per process.
+
+    Args:
+        db_path: Path to the SQLite database file
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+    finally:
+        conn.close()
 
 class DBError(Exception):
     """Base exception class for database errors."""
@@ -19,43 +566,233 @@ class DBManager:
             db_path: Path to the SQLite database file
         """
         self.db_path = db_path
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        # Heavy reads run on workers with read-only connections; under WAL
+        # they see a consistent snapshot and never block the writer
+        self._read_executor: Optional[ThreadPoolExecutor] = None
+        self._reader_threads = set()
+        _enable_wal(db_path)
         self._initialize_db()
+        self._has_fts = self._initialize_fts()
+
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        """
+        Open a tuned connection to the database.
+        
+        Args:
+            read_only: Open the database file in read-only mode
+            
+        Returns:
+            SQLite connection object
+        """
+        if read_only:
+            database, uri = Path(self.db_path).resolve().as_uri() + "?mode=ro", True
+        else:
+            database, uri = self.db_path, False
+        conn = sqlite3.connect(database, uri=uri, check_same_thread=False,
+                               cached_statements=_CACHED_STATEMENTS)
+        conn.row_factory = sqlite3.Row
+        for pragma in _CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Get the calling thread's long-lived connection, opening it on first use.
+        
+        Returns:
+            SQLite connection object
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect(read_only=threading.get_ident() in self._reader_threads)
+            self._local.conn = conn
+            self._local.tx_cursor = None
+            self._local.tx_now = None
+            self._local.idle_cursor = None
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self) -> None:
+        """Close every connection opened by this manager."""
+        if self._read_executor is not None:
+            self._read_executor.shutdown(wait=True)
+            self._read_executor = None
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+    def backup(self, dest_path: str) -> None:
+        """
+        Write a consistent snapshot of the database to a file.
+
+        Uses SQLite's online backup API over a separate read-only
+        connection, so the copy includes changes still in the WAL and can be
+        taken from any thread while others keep writing.
+
+        Args:
+            dest_path: Path of the snapshot file; an existing one is replaced
+
+        Raises:
+            DBError: If the snapshot cannot be written
+        """
+        try:
+            source = self._connect(read_only=True)
+            try:
+                dest = sqlite3.connect(dest_path)
+                try:
+                    source.backup(dest)
+                finally:
+                    dest.close()
+            finally:
+                source.close()
+        except sqlite3.Error as e:
+            raise DBError(f"Database backup failed: {str(e)}")
+
+    def _submit_read(self, fn, *args) -> Future:
+        """
+        Run a read-only method on a background reader thread.
+        
+        Args:
+            fn: Bound DBManager method that only reads
+            *args: Arguments for fn
+            
+        Returns:
+            Future resolving to fn's result
+        """
+        with self._connections_lock:
+            if self._read_executor is None:
+                self._read_executor = ThreadPoolExecutor(
+                    max_workers=_READ_WORKERS,
+                    thread_name_prefix="DBManagerReader",
+                    initializer=lambda: self._reader_threads.add(threading.get_ident()),
+                )
+            executor = self._read_executor
+        return executor.submit(fn, *args)
+
+    def async_get_all_images_with_tags(self) -> "Future[List[Tuple[Dict[str, Any], List[Dict[str, Any]]]]]":
+        """
+        Get all images with their tags without blocking the calling thread.
+        
+        Returns:
+            Future resolving to the get_all_images_with_tags() result
+        """
+        return self._submit_read(self.get_all_images_with_tags)
+
+    def async_search_images(self, query: str, search_type: str = 'all') -> "Future[List[Dict[str, Any]]]":
+        """
+        Search for images without blocking the calling thread.
+        
+        Args:
+            query: Search query string
+            search_type: Type of search ('all', 'filename', 'tags', 'metadata')
+            
+        Returns:
+            Future resolving to the search_images() result
+        """
+        return self._submit_read(self.search_images, query, search_type)
+
+    def _now(self) -> str:
+        """
+        Get the timestamp to store in created_at/updated_at columns.
+        
+        Inside a transaction() block every call returns the same timestamp,
+        taken when the block started, so bulk writes format it only once.
+        
+        Returns:
+            ISO 8601 timestamp string
+        """
+        now = self._local.tx_now
+        return now if now is not None else datetime.now().isoformat()
 
     @contextmanager
     def _get_cursor(self):
         """
-        Context manager for database connections.
+        Context manager for database operations.
+        
+        Uses the calling thread's connection and commits on success. Inside a
+        transaction() block the transaction's cursor is reused and nothing is
+        committed until the block exits.
+        
+        Each thread keeps one idle cursor that is handed out again on the next
+        call; a second cursor is only created while the first is still in use
+        (e.g. by an unfinished iter_all_images_with_tags()).
         
         Yields:
             SQLite cursor object
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        try:
+        conn = self._connection()
+        if self._local.tx_cursor is not None:
+            yield self._local.tx_cursor
+            return
+
+        cursor = self._local.idle_cursor
+        if cursor is None:
             cursor = conn.cursor()
+        else:
+            self._local.idle_cursor = None
+        try:
+            yield cursor
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise DBError(f"Database operation failed: {str(e)}")
+        except BaseException:
+            # Abandoned generator or interrupt: the cursor may still hold an
+            # unfinished statement, so don't hand it out again
+            cursor.close()
+            raise
+        self._local.idle_cursor = cursor
+
+    @contextmanager
+    def transaction(self):
+        """
+        Context manager grouping several operations into one transaction.
+
+        All manager calls made by this thread inside the block are committed
+        together, so a batch pays for a single commit (and fsync) instead of
+        one per row. Nested blocks join the outer transaction.
+
+        Yields:
+            SQLite cursor object
+
+        Raises:
+            DBError: If any operation in the block fails; nothing is committed
+        """
+        conn = self._connection()
+        if self._local.tx_cursor is not None:
+            yield self._local.tx_cursor
+            return
+
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            self._local.tx_cursor = cursor
+            self._local.tx_now = datetime.now().isoformat()
             yield cursor
             conn.commit()
         except Exception as e:
             conn.rollback()
             raise DBError(f"Database operation failed: {str(e)}")
         finally:
-            conn.close()
+            self._local.tx_cursor = None
+            self._local.tx_now = None
 
     def _initialize_db(self) -> None:
         """Initialize database tables if they don't exist."""
         with self._get_cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'images'"
+            )
+            is_new = cursor.fetchone() is None
+
             # Images table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS images (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    md5_checksum TEXT UNIQUE,
-                    reference_code TEXT,
-                    project_path TEXT,
-                    metadata TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
+            cursor.execute(_IMAGES_TABLE_SCHEMA.format(table="images"))
             
             # Image locations table
             cursor.execute("""
@@ -90,6 +827,202 @@ class DBManager:
                 )
             """)
 
+            # Secondary indexes for the join/lookup columns. md5_checksum and
+            # tags.name are UNIQUE and image_tags' primary key leads with
+            # image_id, so those lookups are already indexed.
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_locations_image_id
+                ON image_locations(image_id)
+            """)
+            # (tag_id, image_id) makes tag -> images lookups index-only;
+            # it supersedes the earlier single-column tag_id index
+            cursor.execute("DROP INDEX IF EXISTS idx_image_tags_tag_id")
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_image_tags_tagid_imageid
+                ON image_tags(tag_id, image_id)
+            """)
+
+            # Content hashes of files on disk, valid while size and mtime match
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS file_hashes (
+                    path TEXT,
+                    algorithm TEXT,
+                    size INTEGER,
+                    mtime_ns INTEGER,
+                    digest TEXT,
+                    PRIMARY KEY (path, algorithm)
+                ) WITHOUT ROWID
+            """)
+
+            # Metadata read from files on disk, valid while size and mtime match
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS file_metadata (
+                    path TEXT PRIMARY KEY,
+                    mtime_ns INTEGER,
+                    size INTEGER,
+                    metadata TEXT
+                ) WITHOUT ROWID
+            """)
+
+            # Database-wide settings
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                )
+            """)
+
+            # Galleries created before the algorithm was recorded used MD5
+            cursor.execute(
+                "INSERT OR IGNORE INTO meta (key, value) VALUES ('hash_algorithm', ?)",
+                (DEFAULT_ALGORITHM if is_new else "md5",)
+            )
+            cursor.execute("SELECT value FROM meta WHERE key = 'hash_algorithm'")
+            self.hash_algorithm: str = cursor.fetchone()['value']
+
+        if is_new:
+            self._set_schema_version(_SCHEMA_VERSION)
+        else:
+            self._migrate()
+
+        with self._get_cursor() as cursor:
+            # Sort-by-date listings; needs the migrated columns
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_images_taken_at
+                ON images(taken_at)
+            """)
+
+    def _set_schema_version(self, version: int) -> None:
+        """
+        Record the schema version in the database header.
+        
+        Args:
+            version: Schema version number
+        """
+        with self._get_cursor() as cursor:
+            cursor.execute(f"PRAGMA user_version = {int(version)}")
+
+    def _migrate(self) -> None:
+        """
+        Bring an existing database up to _SCHEMA_VERSION.
+        
+        Raises:
+            DBError: If a migration step fails; the database is left at the
+                last completed version
+        """
+        with self._get_cursor() as cursor:
+            cursor.execute("PRAGMA user_version")
+            version = cursor.fetchone()[0]
+
+        if version < 1:
+            self._migrate_md5_to_blob()
+            self._set_schema_version(1)
+        if version < 2:
+            self._migrate_metadata_columns()
+            self._set_schema_version(2)
+        if version < 3:
+            self._migrate_file_size()
+            self._set_schema_version(3)
+
+    def _migrate_metadata_columns(self) -> None:
+        """Add the _METADATA_COLUMNS to images and fill them from the JSON."""
+        with self.transaction() as cursor:
+            cursor.execute("PRAGMA table_info(images)")
+            existing = {row['name'] for row in cursor.fetchall()}
+            column_types = {'width': 'INTEGER', 'height': 'INTEGER',
+                            'taken_at': 'TIMESTAMP', 'camera': 'TEXT'}
+            for column in _METADATA_COLUMNS:
+                if column not in existing:
+                    cursor.execute(
+                        f"ALTER TABLE images ADD COLUMN {column} {column_types[column]}"
+                    )
+
+            cursor.execute("SELECT id, metadata FROM images")
+            updates = [(*_metadata_columns(_loads_metadata(row['metadata'])), row['id'])
+                       for row in cursor.fetchall()]
+            cursor.executemany(
+                "UPDATE images SET width = ?, height = ?, taken_at = ?, camera = ? WHERE id = ?",
+                updates
+            )
+
+    def _migrate_file_size(self) -> None:
+        """Add images.file_size, filled from the first location that still exists."""
+        with self._get_cursor() as cursor:
+            cursor.execute("PRAGMA table_info(images)")
+            has_column = any(row['name'] == 'file_size' for row in cursor.fetchall())
+            cursor.execute("SELECT image_id, file_path FROM image_locations ORDER BY image_id, id")
+            locations = cursor.fetchall()
+
+        # Stat outside the write transaction; it may touch slow or absent mounts
+        sizes = {}
+        for image_id, rows in groupby(locations, key=itemgetter(0)):
+            for row in rows:
+                size = _file_size(row[1])
+                if size is not None:
+                    sizes[image_id] = size
+                    break
+
+        with self.transaction() as cursor:
+            if not has_column:
+                cursor.execute("ALTER TABLE images ADD COLUMN file_size INTEGER")
+            cursor.executemany(
+                "UPDATE images SET file_size = ? WHERE id = ?",
+                [(size, image_id) for image_id, size in sizes.items()]
+            )
+
+    def _migrate_md5_to_blob(self) -> None:
+        """
+        Rebuild the images table with md5_checksum stored as raw digest BLOBs.
+        
+        SQLite cannot change a column's type in place, so this follows the
+        documented create/copy/drop/rename procedure. IDs are preserved, so
+        rows referencing images stay valid. Triggers on images are dropped
+        with the old table and recreated by _initialize_fts().
+        """
+        conn = self._connection()
+        conn.create_function("migrate_md5", 1, _md5_to_blob, deterministic=True)
+        # Columns as they were before any migration
+        columns = "id, md5_checksum, reference_code, project_path, metadata, created_at, updated_at"
+        conn.execute("PRAGMA foreign_keys=OFF")
+        try:
+            with self.transaction() as cursor:
+                cursor.execute("DROP TABLE IF EXISTS images_migration")
+                cursor.execute(_IMAGES_TABLE_SCHEMA.format(table="images_migration"))
+                cursor.execute(f"""
+                    INSERT INTO images_migration ({columns})
+                    SELECT {columns.replace('md5_checksum', 'migrate_md5(md5_checksum)')}
+                    FROM images
+                """)
+                cursor.execute("DROP TABLE images")
+                cursor.execute("ALTER TABLE images_migration RENAME TO images")
+                cursor.execute("PRAGMA foreign_key_check")
+                if cursor.fetchone() is not None:
+                    raise DBError("Foreign key check failed after rebuilding images")
+        finally:
+            conn.execute("PRAGMA foreign_keys=ON")
+
+    def _initialize_fts(self) -> bool:
+        """
+        Create the full-text search index, filling it from existing rows.
+        
+        Returns:
+            True if the index is available, False if this SQLite build
+            lacks FTS5 or the trigram tokenizer
+        """
+        try:
+            with self._get_cursor() as cursor:
+                cursor.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'images_fts'"
+                )
+                exists = cursor.fetchone() is not None
+                for statement in _FTS_SCHEMA:
+                    cursor.execute(statement)
+                if not exists:
+                    cursor.execute(_SQL_FTS_BACKFILL)
+        except DBError:
+            return False
+        return True
+
     def add_image(self, file_path: str, md5_checksum: str, reference_code: str, 
                  metadata: Optional[Dict] = None) -> int:
         """
@@ -107,28 +1040,66 @@ class DBManager:
         Raises:
             DBError: If the operation fails
         """
+        file_size = _file_size(file_path)
         with self._get_cursor() as cursor:
-            now = datetime.now().isoformat()
+            now = self._now()
             cursor.execute(
-                """
-                INSERT INTO images 
-                (md5_checksum, reference_code, metadata, created_at, updated_at) 
-                VALUES (?, ?, ?, ?, ?)
-                """,
-                (md5_checksum, reference_code, json.dumps(metadata or {}), now, now)
+                _SQL_INSERT_IMAGE,
+                (_md5_to_blob(md5_checksum), reference_code, _dumps_metadata(metadata), now, now,
+                 *_metadata_columns(metadata), file_size)
             )
             image_id = cursor.lastrowid
             
             cursor.execute(
-                """
-                INSERT INTO image_locations (image_id, file_path, created_at) 
-                VALUES (?, ?, ?)
-                """,
+                _SQL_INSERT_LOCATION,
                 (image_id, file_path, now)
             )
             
             return image_id
 
+    def add_images_bulk(self, images: List[Tuple[str, str, str, Optional[Dict]]]) -> List[int]:
+        """
+        Add several new images in a single transaction.
+
+        Args:
+            images: List of (file_path, md5_checksum, reference_code, metadata)
+                tuples; metadata may be None
+
+        Returns:
+            IDs of the newly created image records, in input order
+
+        Raises:
+            DBError: If the operation fails; no image is added in that case
+        """
+        if not images:
+            return []
+
+        # Stat before taking the write lock
+        file_sizes = [_file_size(file_path) for file_path, _, _, _ in images]
+
+        with self.transaction() as cursor:
+            # BEGIN IMMEDIATE holds the write lock, so the IDs can be
+            # allocated up front instead of reading lastrowid per row.
+            cursor.execute(_SQL_NEXT_IMAGE_ID)
+            first_id = cursor.fetchone()[0]
+            image_ids = list(range(first_id, first_id + len(images)))
+            now = self._now()
+
+            cursor.executemany(
+                _SQL_INSERT_IMAGE_WITH_ID,
+                [(image_id, _md5_to_blob(md5_checksum), reference_code,
+                  _dumps_metadata(metadata), now, now, *_metadata_columns(metadata), file_size)
+                 for image_id, (_, md5_checksum, reference_code, metadata), file_size
+                 in zip(image_ids, images, file_sizes)]
+            )
+            cursor.executemany(
+                _SQL_INSERT_LOCATION,
+                [(image_id, file_path, now)
+                 for image_id, (file_path, _, _, _) in zip(image_ids, images)]
+            )
+
+            return image_ids
+
     def get_image_by_md5(self, md5_checksum: str) -> Optional[Dict[str, Any]]:
         """
         Get image information by MD5 checksum.
@@ -140,22 +1111,165 @@ class DBManager:
             Dictionary containing image information or None if not found
         """
         with self._get_cursor() as cursor:
-            cursor.execute("""
-                SELECT i.*, GROUP_CONCAT(il.file_path) as locations
-                FROM images i
-                LEFT JOIN image_locations il ON i.id = il.image_id
-                WHERE i.md5_checksum = ?
-                GROUP BY i.id
-            """, (md5_checksum,))
+            cursor.execute(_SQL_GET_BY_MD5, (_md5_to_blob(md5_checksum),))
             
-            row = cursor.fetchone()
-            if row:
-                result = dict(row)
-                result['metadata'] = json.loads(result['metadata'])
-                result['locations'] = result['locations'].split(',') if result['locations'] else []
+            # One row per location, so paths containing commas survive intact
+            rows = cursor.fetchall()
+            if rows:
+                result = _image_from_row(rows[0])
+                result['locations'] = [row[_EXTRA_INDEX] for row in rows
+                                       if row[_EXTRA_INDEX] is not None]
                 return result
             return None
 
+    def get_checksum_sizes(self) -> Dict[str, Optional[int]]:
+        """
+        Get every image's checksum together with its recorded file size.
+        
+        Returns:
+            Dictionary mapping lowercase hex digests to sizes in bytes
+            (None where the size was never recorded)
+        """
+        with self._get_cursor() as cursor:
+            cursor.execute("SELECT md5_checksum, file_size FROM images")
+            return {_md5_to_hex(row[0]).lower(): row[1] for row in _iter_rows(cursor)}
+
+    def get_existing_checksums(self, checksums: List[str]) -> Set[str]:
+        """
+        Find which of several checksums already belong to an image.
+
+        Runs one indexed lookup per chunk of checksums instead of one
+        get_image_by_md5() call per file.
+
+        Args:
+            checksums: Hex digests to look up
+
+        Returns:
+            The subset of checksums present in the database, as given
+        """
+        by_key = {_md5_to_blob(checksum): checksum for checksum in checksums}
+        keys = list(by_key)
+        existing = set()
+        if not keys:
+            return existing
+
+        with self._get_cursor() as cursor:
+            for start in range(0, len(keys), _MAX_IN_PARAMS):
+                chunk = keys[start:start + _MAX_IN_PARAMS]
+                placeholders = ",".join("?" * len(chunk))
+                cursor.execute(
+                    f"SELECT md5_checksum FROM images WHERE md5_checksum IN ({placeholders})",
+                    chunk
+                )
+                existing.update(by_key[row[0]] for row in _iter_rows(cursor))
+        return existing
+
+    def get_cached_hashes(self, file_paths: List[str],
+                          algorithm: str) -> Dict[str, Tuple[int, int, str]]:
+        """
+        Get the stored hashes of several files on disk.
+
+        Args:
+            file_paths: Absolute paths of the files
+            algorithm: Hash algorithm name
+
+        Returns:
+            Mapping of path to the (size, mtime_ns, digest) recorded when the
+            file was hashed; paths never hashed are left out
+        """
+        paths = list(dict.fromkeys(file_paths))
+        cached = {}
+        with self._get_cursor() as cursor:
+            for start in range(0, len(paths), _MAX_IN_PARAMS):
+                chunk = paths[start:start + _MAX_IN_PARAMS]
+                placeholders = ",".join("?" * len(chunk))
+                cursor.execute(
+                    "SELECT path, size, mtime_ns, digest FROM file_hashes "
+                    f"WHERE algorithm = ? AND path IN ({placeholders})",
+                    [algorithm, *chunk]
+                )
+                cached.update((row[0], (row[1], row[2], row[3])) for row in _iter_rows(cursor))
+        return cached
+
+    def set_cached_hashes(self, entries: List[Tuple[str, str, int, int, str]]) -> None:
+        """
+        Store the hashes of several files on disk in one transaction,
+        replacing any earlier ones.
+
+        Args:
+            entries: (path, algorithm, size, mtime_ns, digest) tuples, with
+                the absolute path and the file's size and modification time
+                in nanoseconds when it was hashed
+
+        Raises:
+            DBError: If the operation fails; nothing is changed in that case
+        """
+        if not entries:
+            return
+
+        with self.transaction() as cursor:
+            cursor.executemany(_SQL_SET_FILE_HASH, entries)
+
+    def get_cached_metadata(self, file_path: str, mtime_ns: int, size: int) -> Optional[Dict[str, Any]]:
+        """
+        Get the stored metadata of a file on disk, if the file is unchanged.
+
+        Args:
+            file_path: Path of the file
+            mtime_ns: Current modification time of the file in nanoseconds
+            size: Current size of the file in bytes
+
+        Returns:
+            Metadata dictionary as stored (JSON types), or None if nothing
+            was stored for this version of the file
+        """
+        with self._get_cursor() as cursor:
+            cursor.execute(_SQL_GET_FILE_METADATA, (file_path, mtime_ns, size))
+            row = cursor.fetchone()
+            return _loads_metadata(row[0]) if row else None
+
+    def get_cached_metadata_bulk(self, files: List[Tuple[str, int, int]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the stored metadata of several files in one query per chunk.
+
+        Args:
+            files: (file_path, mtime_ns, size) of each file, as currently on disk
+
+        Returns:
+            Dictionary mapping each path with up-to-date stored metadata to it
+        """
+        current = {path: (mtime_ns, size) for path, mtime_ns, size in files}
+        paths = list(current)
+        found = {}
+        with self._get_cursor() as cursor:
+            for start in range(0, len(paths), _MAX_IN_PARAMS):
+                chunk = paths[start:start + _MAX_IN_PARAMS]
+                placeholders = ",".join("?" * len(chunk))
+                cursor.execute(
+                    "SELECT path, mtime_ns, size, metadata FROM file_metadata "
+                    f"WHERE path IN ({placeholders})",
+                    chunk
+                )
+                for path, mtime_ns, size, metadata in _iter_rows(cursor):
+                    if current[path] == (mtime_ns, size):
+                        found[path] = _loads_metadata(metadata)
+        return found
+
+    def set_cached_metadata(self, file_path: str, mtime_ns: int, size: int,
+                            metadata: Dict[str, Any]) -> None:
+        """
+        Store the metadata read from a file on disk, replacing any earlier one.
+
+        Args:
+            file_path: Path of the file
+            mtime_ns: Modification time of the file in nanoseconds when it was read
+            size: Size of the file in bytes when it was read
+            metadata: Metadata dictionary
+        """
+        with self._get_cursor() as cursor:
+            cursor.execute(_SQL_SET_FILE_METADATA,
+                           (file_path, mtime_ns, size, _dumps_metadata(metadata)))
+
     def add_image_location(self, image_id: int, file_path: str, is_verified: bool = True) -> None:
         """
         Add a new location for an existing image.
@@ -167,11 +1281,8 @@ class DBManager:
         """
         with self._get_cursor() as cursor:
             cursor.execute(
-                """
-                INSERT INTO image_locations (image_id, file_path, is_verified, created_at) 
-                VALUES (?, ?, ?, ?)
-                """,
-                (image_id, file_path, is_verified, datetime.now().isoformat())
+                _SQL_INSERT_LOCATION_VERIFIED,
+                (image_id, file_path, is_verified, self._now())
             )
 
     def verify_location(self, image_id: int, file_path: str, exists: bool) -> None:
@@ -185,22 +1296,46 @@ class DBManager:
         """
         with self._get_cursor() as cursor:
             if exists:
-                cursor.execute(
-                    """
-                    UPDATE image_locations 
-                    SET is_verified = 1 
-                    WHERE image_id = ? AND file_path = ?
-                    """,
-                    (image_id, file_path)
-                )
+                cursor.execute(_SQL_VERIFY_LOCATION, (image_id, file_path))
             else:
-                cursor.execute(
-                    """
-                    DELETE FROM image_locations 
-                    WHERE image_id = ? AND file_path = ?
-                    """,
-                    (image_id, file_path)
-                )
+                cursor.execute(_SQL_DELETE_LOCATION, (image_id, file_path))
+
+    def get_all_locations(self) -> List[Tuple[int, str]]:
+        """
+        Get every recorded image location.
+
+        Returns:
+            (image_id, file_path) pairs
+        """
+        with self._get_cursor() as cursor:
+            cursor.execute(_SQL_ALL_LOCATIONS)
+            return [(row[0], row[1]) for row in _iter_rows(cursor)]
+
+    def bulk_verify_locations(self, results: List[Tuple[int, str, bool]]) -> None:
+        """
+        Apply the outcome of verifying several locations in one transaction.
+
+        Locations whose file exists are marked verified and the rest are
+        removed, as verify_location() does for a single location.
+
+        Args:
+            results: (image_id, file_path, exists) tuples
+
+        Raises:
+            DBError: If the operation fails; nothing is changed in that case
+        """
+        if not results:
+            return
+
+        with self.transaction() as cursor:
+            cursor.executemany(
+                _SQL_VERIFY_LOCATION,
+                [(image_id, path) for image_id, path, exists in results if exists]
+            )
+            cursor.executemany(
+                _SQL_DELETE_LOCATION,
+                [(image_id, path) for image_id, path, exists in results if not exists]
+            )
 
     def set_project_path(self, image_id: int, project_path: str) -> None:
         """
@@ -212,12 +1347,35 @@ class DBManager:
         """
         with self._get_cursor() as cursor:
             cursor.execute(
-                """
-                UPDATE images 
-                SET project_path = ?, updated_at = ? 
-                WHERE id = ?
-                """,
-                (project_path, datetime.now().isoformat(), image_id)
+                _SQL_SET_PROJECT_PATH,
+                (project_path, self._now(), image_id)
+            )
+
+    def add_project_copies(self, copies: List[Tuple[int, str]]) -> None:
+        """
+        Record copies of images placed in the project folder.
+
+        Each copy is added as a verified location and becomes its image's
+        project path. The whole batch is written in a single transaction.
+
+        Args:
+            copies: (image_id, project_path) pairs
+
+        Raises:
+            DBError: If the operation fails; nothing is recorded in that case
+        """
+        if not copies:
+            return
+
+        with self.transaction() as cursor:
+            now = self._now()
+            cursor.executemany(
+                _SQL_INSERT_LOCATION_VERIFIED,
+                [(image_id, path, True, now) for image_id, path in copies]
+            )
+            cursor.executemany(
+                _SQL_SET_PROJECT_PATH,
+                [(path, now, image_id) for image_id, path in copies]
             )
 
     def add_tag(self, tag_name: str) -> int:
@@ -231,17 +1389,56 @@ class DBManager:
             ID of the tag
         """
         with self._get_cursor() as cursor:
-            cursor.execute(
-                """
-                INSERT OR IGNORE INTO tags (name, created_at) 
-                VALUES (?, ?)
-                """,
-                (tag_name, datetime.now().isoformat())
-            )
+            if _HAS_RETURNING:
+                cursor.execute(_SQL_UPSERT_TAG, (tag_name, self._now()))
+                return cursor.fetchone()['id']
+
+            cursor.execute(_SQL_INSERT_TAG, (tag_name, self._now()))
             
-            cursor.execute("SELECT id FROM tags WHERE name = ?", (tag_name,))
+            cursor.execute(_SQL_GET_TAG_ID, (tag_name,))
             return cursor.fetchone()['id']
 
+    def get_tag_id_by_name(self, tag_name: str) -> Optional[int]:
+        """
+        Get the ID of a tag.
+
+        Args:
+            tag_name: Exact name of the tag
+
+        Returns:
+            ID of the tag, or None if there is no such tag
+        """
+        with self._get_cursor() as cursor:
+            cursor.execute(_SQL_GET_TAG_ID, (tag_name,))
+            row = cursor.fetchone()
+            return row['id'] if row else None
+
+    def add_tags_bulk(self, tag_names: List[str]) -> Dict[str, int]:
+        """
+        Add several tags in a single transaction, reusing existing ones.
+
+        Args:
+            tag_names: Names of the tags
+
+        Returns:
+            Dictionary mapping each tag name to its ID
+        """
+        names = list(dict.fromkeys(tag_names))
+        if not names:
+            return {}
+
+        with self.transaction() as cursor:
+            now = self._now()
+            cursor.executemany(_SQL_INSERT_TAG, [(name, now) for name in names])
+
+            tag_ids = {}
+            for start in range(0, len(names), _MAX_IN_PARAMS):
+                chunk = names[start:start + _MAX_IN_PARAMS]
+                placeholders = ",".join("?" * len(chunk))
+                cursor.execute(f"SELECT name, id FROM tags WHERE name IN ({placeholders})", chunk)
+                tag_ids.update((row['name'], row['id']) for row in cursor.fetchall())
+            return tag_ids
+
     def add_tag_to_image(self, image_id: int, tag_id: int) -> None:
         """
         Associate a tag with an image.
@@ -252,13 +1449,50 @@ class DBManager:
         """
         with self._get_cursor() as cursor:
             cursor.execute(
-                """
-                INSERT OR IGNORE INTO image_tags (image_id, tag_id, created_at) 
-                VALUES (?, ?, ?)
-                """,
-                (image_id, tag_id, datetime.now().isoformat())
+                _SQL_INSERT_IMAGE_TAG,
+                (image_id, tag_id, self._now())
             )
 
+    def add_tags_to_image_bulk(self, image_id: int, tag_ids: List[int]) -> None:
+        """
+        Associate several tags with an image in a single transaction.
+
+        Args:
+            image_id: ID of the image
+            tag_ids: IDs of the tags
+        """
+        if not tag_ids:
+            return
+
+        with self.transaction() as cursor:
+            now = self._now()
+            cursor.executemany(
+                _SQL_INSERT_IMAGE_TAG,
+                [(image_id, tag_id, now) for tag_id in tag_ids]
+            )
+
+    def add_tags_and_link(self, image_id: int, tag_names: List[str]) -> Dict[str, int]:
+        """
+        Add tags by name, reusing existing ones, and associate them with an image.
+
+        Everything runs in a single transaction: one batched tag insert, one
+        name-to-ID lookup and one batched link insert.
+
+        Args:
+            image_id: ID of the image
+            tag_names: Names of the tags
+
+        Returns:
+            Dictionary mapping each tag name to its ID
+
+        Raises:
+            DBError: If the operation fails; no tag is linked in that case
+        """
+        with self.transaction():
+            tag_ids = self.add_tags_bulk(tag_names)
+            self.add_tags_to_image_bulk(image_id, list(tag_ids.values()))
+            return tag_ids
+
     def get_tags_for_image(self, image_id: int) -> List[str]:
         """
         Get all tags associated with an image.
@@ -270,15 +1504,54 @@ class DBManager:
             List of tag names
         """
         with self._get_cursor() as cursor:
-            cursor.execute("""
-                SELECT t.name
-                FROM tags t
-                JOIN image_tags it ON t.id = it.tag_id
-                WHERE it.image_id = ?
-                ORDER BY t.name
-            """, (image_id,))
+            cursor.execute(_SQL_GET_TAGS_FOR_IMAGE, (image_id,))
             return [row['name'] for row in cursor.fetchall()]
 
+    def get_tags_for_images(self, image_ids: List[int]) -> Dict[int, List[str]]:
+        """
+        Get the tags of several images with one query per chunk of IDs.
+        
+        Args:
+            image_ids: IDs of the images
+            
+        Returns:
+            Dictionary mapping each requested image ID to its sorted tag
+            names (empty for untagged images)
+        """
+        tags_by_id = {image_id: [] for image_id in image_ids}
+        ids = list(tags_by_id)
+        if not ids:
+            return tags_by_id
+
+        with self._get_cursor() as cursor:
+            for start in range(0, len(ids), _MAX_IN_PARAMS):
+                chunk = ids[start:start + _MAX_IN_PARAMS]
+                placeholders = ",".join("?" * len(chunk))
+                cursor.execute(f"""
+                    SELECT it.image_id, t.name
+                    FROM image_tags it
+                    JOIN tags t ON t.id = it.tag_id
+                    WHERE it.image_id IN ({placeholders})
+                    ORDER BY t.name
+                """, chunk)
+                for row in _iter_rows(cursor):
+                    tags_by_id[row['image_id']].append(row['name'])
+        return tags_by_id
+
+    def get_images_by_tag(self, tag_name: str) -> List[Dict[str, Any]]:
+        """
+        Get all images carrying a tag.
+        
+        Args:
+            tag_name: Exact name of the tag
+            
+        Returns:
+            List of image records, newest first
+        """
+        with self._get_cursor() as cursor:
+            cursor.execute(_SQL_GET_IMAGES_BY_TAG, (tag_name,))
+            return [_image_from_row(row) for row in _iter_rows(cursor)]
+
     def remove_tags_for_image(self, image_id: int) -> None:
         """
         Remove all tags from an image.
@@ -287,7 +1560,39 @@ class DBManager:
             image_id: ID of the image
         """
         with self._get_cursor() as cursor:
-            cursor.execute("DELETE FROM image_tags WHERE image_id = ?", (image_id,))
+            cursor.execute(_SQL_DELETE_IMAGE_TAGS, (image_id,))
+
+    def remove_tag_from_image(self, image_id: int, tag_id: int) -> None:
+        """
+        Remove one tag from an image.
+
+        Args:
+            image_id: ID of the image
+            tag_id: ID of the tag
+        """
+        with self._get_cursor() as cursor:
+            cursor.execute(_SQL_DELETE_IMAGE_TAG, (image_id, tag_id))
+
+    def set_image_tags(self, image_id: int, tag_names: List[str]) -> Dict[str, int]:
+        """
+        Replace an image's tags, adding any that don't exist yet.
+
+        The old links are dropped and the new ones written in a single
+        transaction, so the image is never seen half-retagged.
+
+        Args:
+            image_id: ID of the image
+            tag_names: Names of the tags the image should have
+
+        Returns:
+            Dictionary mapping each tag name to its ID
+
+        Raises:
+            DBError: If the operation fails; the old tags are kept in that case
+        """
+        with self.transaction():
+            self.remove_tags_for_image(image_id)
+            return self.add_tags_and_link(image_id, tag_names)
 
     def update_image_metadata(self, image_id: int, metadata: Dict) -> None:
         """
@@ -297,14 +1602,13 @@ class DBManager:
             image_id: ID of the image
             metadata: New metadata dictionary
         """
+        serialized = _dumps_metadata(metadata)
         with self._get_cursor() as cursor:
+            # A row already holding this JSON doesn't match, so an unchanged
+            # write rewrites no page and leaves updated_at alone
             cursor.execute(
-                """
-                UPDATE images 
-                SET metadata = ?, updated_at = ? 
-                WHERE id = ?
-                """,
-                (json.dumps(metadata), datetime.now().isoformat(), image_id)
+                _SQL_UPDATE_METADATA,
+                (serialized, self._now(), *_metadata_columns(metadata), image_id, serialized)
             )
 
     def delete_image(self, image_id: int) -> None:
@@ -315,9 +1619,8 @@ class DBManager:
             image_id: ID of the image to delete
         """
         with self._get_cursor() as cursor:
-            cursor.execute("DELETE FROM image_tags WHERE image_id = ?", (image_id,))
-            cursor.execute("DELETE FROM image_locations WHERE image_id = ?", (image_id,))
-            cursor.execute("DELETE FROM images WHERE id = ?", (image_id,))
+            # Tags and locations go with it via ON DELETE CASCADE
+            cursor.execute(_SQL_DELETE_IMAGE, (image_id,))
 
     def get_all_images_with_tags(self) -> List[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
         """
@@ -326,35 +1629,77 @@ class DBManager:
         Returns:
             List of tuples containing (image_info, tags)
         """
+        return list(self.iter_all_images_with_tags())
+
+    def get_image_with_tags(self, image_id: int) -> Optional[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+        """
+        Get a single image with its associated tags.
+
+        Args:
+            image_id: ID of the image
+
+        Returns:
+            Tuple of (image_info, tags) as yielded by
+            iter_all_images_with_tags(), or None if there is no such image
+        """
         with self._get_cursor() as cursor:
-            cursor.execute("""
-                SELECT i.*, GROUP_CONCAT(il.file_path) as locations,
-                       GROUP_CONCAT(t.id) as tag_ids,
-                       GROUP_CONCAT(t.name) as tag_names
-                FROM images i
-                LEFT JOIN image_locations il ON i.id = il.image_id
-                LEFT JOIN image_tags it ON i.id = it.image_id
-                LEFT JOIN tags t ON it.tag_id = t.id
-                GROUP BY i.id
-                ORDER BY i.created_at DESC
-            """)
-            
-            results = []
-            for row in cursor.fetchall():
-                image = dict(row)
-                image['metadata'] = json.loads(image['metadata'])
-                image['locations'] = image['locations'].split(',') if image['locations'] else []
-                
-                tags = []
-                if row['tag_ids'] and row['tag_names']:
-                    tag_ids = row['tag_ids'].split(',')
-                    tag_names = row['tag_names'].split(',')
-                    tags = [{'id': int(tid), 'name': name} 
-                           for tid, name in zip(tag_ids, tag_names)]
-                
-                results.append((image, tags))
-            
-            return results
+            cursor.execute(_SQL_IMAGE_WITH_TAGS, (image_id,))
+            rows = cursor.fetchall()
+        return _image_with_tags_from_rows(rows) if rows else None
+
+    def get_image_table_columns(self, image_ids: Optional[List[int]] = None) -> Dict[str, Sequence]:
+        """
+        Get the gallery table as parallel per-column sequences.
+
+        The joins and formatting happen in SQL and the rows are transposed
+        once, so a table view can index straight into a column instead of
+        building and dereferencing a dictionary per image.
+
+        Args:
+            image_ids: Only include these images, in this order (e.g. search
+                results); default is every image
+
+        Returns:
+            Dictionary with 'id' (array of ints), 'file_path',
+            'reference_code' and 'tag_names' (comma-separated), ordered
+            like get_all_images_with_tags() unless image_ids is given
+        """
+        with self._get_cursor() as cursor:
+            if image_ids is None:
+                cursor.execute(_SQL_IMAGE_TABLE_COLUMNS)
+                rows = cursor.fetchall()
+            else:
+                ids = list(dict.fromkeys(image_ids))
+                rows_by_id = {}
+                for start in range(0, len(ids), _MAX_IN_PARAMS):
+                    chunk = ids[start:start + _MAX_IN_PARAMS]
+                    placeholders = ",".join("?" * len(chunk))
+                    cursor.execute(_SQL_IMAGE_TABLE_SELECT + f"WHERE i.id IN ({placeholders})", chunk)
+                    rows_by_id.update((row['id'], row) for row in cursor.fetchall())
+                rows = [rows_by_id[image_id] for image_id in ids if image_id in rows_by_id]
+
+        ids, file_paths, reference_codes, tag_names = zip(*rows) if rows else ((), (), (), ())
+        return {
+            'id': array('q', ids),
+            'file_path': list(file_paths),
+            'reference_code': list(reference_codes),
+            'tag_names': list(tag_names),
+        }
+
+    def iter_all_images_with_tags(self) -> Iterator[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+        """
+        Stream all images with their associated tags.
+
+        Rows are fetched in batches, so memory stays flat however large the
+        gallery is and callers can start processing before the query ends.
+
+        Yields:
+            Tuples containing (image_info, tags)
+        """
+        with self._get_cursor() as cursor:
+            cursor.execute(_SQL_ALL_IMAGES_WITH_TAGS)
+            for _, rows in groupby(_iter_rows(cursor), key=itemgetter(0)):
+                yield _image_with_tags_from_rows(list(rows))
 
     def search_images(self, query: str, search_type: str = 'all') -> List[Dict[str, Any]]:
         """
@@ -368,33 +1713,35 @@ class DBManager:
             List of matching image records
         """
         with self._get_cursor() as cursor:
-            if search_type == 'all':
-                cursor.execute("""
-                    SELECT DISTINCT i.* FROM images i
-                    LEFT JOIN image_locations il ON i.id = il.image_id
-                    LEFT JOIN image_tags it ON i.id = it.image_id
-                    LEFT JOIN tags t ON it.tag_id = t.id
-                    WHERE il.file_path LIKE ? 
-                    OR t.name LIKE ?
-                    OR i.metadata LIKE ?
-                """, (f"%{query}%", f"%{query}%", f"%{query}%"))
+            if (self._has_fts and search_type in _FTS_SEARCH_COLUMNS
+                    and len(query) >= _FTS_MIN_QUERY_LENGTH):
+                # Quote the query as a single FTS phrase
+                match = '"' + query.replace('"', '""') + '"'
+                column = _FTS_SEARCH_COLUMNS[search_type]
+                if column:
+                    match = f"{column} : {match}"
+                cursor.execute(_SQL_SEARCH_FTS, (match,))
+            elif search_type == 'all':
+                pattern = f"%{query}%"
+                cursor.execute(_SQL_SEARCH_ALL, (pattern, pattern, pattern))
             elif search_type == 'filename':
-                cursor.execute("""
-                    SELECT DISTINCT i.* FROM images i
-                    JOIN image_locations il ON i.id = il.image_id
-                    WHERE il.file_path LIKE ?
-                """, (f"%{query}%",))
+                cursor.execute(_SQL_SEARCH_FILENAME, (f"%{query}%",))
             elif search_type == 'tags':
-                cursor.execute("""
-                    SELECT DISTINCT i.* FROM images i
-                    JOIN image_tags it ON i.id = it.image_id
-                    JOIN tags t ON it.tag_id = t.id
-                    WHERE t.name LIKE ?
-                """, (f"%{query}%",))
+                cursor.execute(_SQL_SEARCH_TAGS, (f"%{query}%",))
             else:  # metadata
-                cursor.execute("""
-                    SELECT * FROM images
-                    WHERE metadata LIKE ?
-                """, (f"%{query}%",))
+                cursor.execute(_SQL_SEARCH_METADATA, (f"%{query}%",))
             
-            return [dict(row) for row in cursor.fetchall()]
+            return [_image_from_row(row) for row in _iter_rows(cursor)]
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get gallery-wide counters in a single query.
+        
+        Returns:
+            Dictionary with 'total' (number of images) and 'tagged'
+            (number of images carrying at least one tag)
+        """
+        with self._get_cursor() as cursor:
+            cursor.execute(_SQL_STATS)
+            row = cursor.fetchone()
+            return {'total': row['total'], 'tagged': row['tagged']}
@@ -1,12 +1,148 @@
-from dataclasses import dataclass, field
-from typing import Optional, List, Dict, Any
+from dataclasses import dataclass, field, fields
+from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime
-import hashlib
+from collections import OrderedDict
+from functools import lru_cache
+from itertools import chain
 import os
+import json
+import threading
 from PIL import Image
 from PIL.ExifTags import TAGS
+from checksum import DEFAULT_ALGORITHM, hash_file
 
-@dataclass
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
+# EXIF Orientation tag, and the values that rotate the image by 90 degrees
+_ORIENTATION_TAG = 0x0112
+_TRANSPOSED_ORIENTATIONS = frozenset((5, 6, 7, 8))
+
+# IFD0 tag pointing at the Exif sub-IFD
+_EXIF_IFD_POINTER = 0x8769
+
+# Bound once so the per-tag loop avoids the global and attribute lookups
+_TAG_NAME = TAGS.get
+
+# Batch imports share timestamps, so parsed ones are reused; datetimes
+# are immutable, which makes sharing them safe
+_fromisoformat = lru_cache(maxsize=65536)(datetime.fromisoformat)
+
+# Number of files whose extracted metadata is kept in memory
+_METADATA_CACHE_SIZE = 4096
+
+# (st_dev, st_ino, st_mtime_ns, st_size) -> metadata; keyed on the inode
+# rather than the path so renames and moves still hit
+_metadata_cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+_metadata_cache_lock = threading.Lock()
+
+def _read_metadata(file_path: str) -> Dict[str, Any]:
+    """
+    Read format, mode, size and EXIF tags from an image file.
+
+    Only the file header is parsed: Pillow opens lazily and nothing here
+    touches pixel data, so no image is decoded. 'display_size' is the size
+    after applying the EXIF orientation, computed by swapping the
+    dimensions rather than calling exif_transpose (which decodes).
+
+    Args:
+        file_path: Path to the image file
+
+    Returns:
+        Metadata dictionary; contains an 'error' key if reading failed
+    """
+    metadata = {}
+    try:
+        with Image.open(file_path) as img:
+            metadata['format'] = img.format
+            metadata['mode'] = img.mode
+            metadata['size'] = img.size
+            metadata['display_size'] = img.size
+            
+            exif = img.getexif()
+            if exif.get(_ORIENTATION_TAG) in _TRANSPOSED_ORIENTATIONS:
+                metadata['display_size'] = img.size[::-1]
+            metadata.update(exif_items(exif))
+    except Exception as e:
+        metadata['error'] = str(e)
+    return metadata
+
+def exif_items(exif: Image.Exif) -> List[Tuple[Any, str]]:
+    """
+    List EXIF tags by name, including those of the Exif sub-IFD.
+
+    getexif() only covers IFD0; capture details such as DateTimeOriginal
+    sit in the Exif sub-IFD.
+
+    Args:
+        exif: EXIF data, as returned by getexif()
+
+    Returns:
+        (tag name, or the tag ID if it has none, value as a string) pairs
+    """
+    tag_name, to_str = _TAG_NAME, str
+    return [(tag_name(tag_id, tag_id), to_str(value))
+            for tag_id, value in chain(exif.items(), exif.get_ifd(_EXIF_IFD_POINTER).items())]
+
+def verify_image(file_path: str) -> Dict[Any, str]:
+    """
+    Check that a file is a valid image and read its EXIF tags.
+
+    verify() leaves the image unusable, and for some formats (PNG among
+    them) getexif() loads the image data, after which verify() refuses to
+    run. So verification gets its own open and EXIF is read from a second.
+
+    Args:
+        file_path: Path to the image file
+
+    Returns:
+        EXIF tags by name; empty if they can't be read
+
+    Raises:
+        Exception: Whatever Pillow raises if the file is not a valid image
+    """
+    with Image.open(file_path) as img:
+        img.verify()
+    try:
+        with Image.open(file_path) as img:
+            return dict(exif_items(img.getexif()))
+    except Exception:
+        # Unreadable EXIF shouldn't make a valid image fail
+        return {}
+
+def _extract_metadata(file_path: str) -> Dict[str, Any]:
+    """
+    Get an image file's metadata, reusing earlier results for unchanged files.
+
+    Args:
+        file_path: Path to the image file
+
+    Returns:
+        Metadata dictionary (a fresh copy the caller may modify)
+
+    Raises:
+        OSError: If the file cannot be stat'ed
+    """
+    st = os.stat(file_path)
+    key = (st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size)
+    with _metadata_cache_lock:
+        cached = _metadata_cache.get(key)
+        if cached is not None:
+            _metadata_cache.move_to_end(key)
+            return dict(cached)
+
+    metadata = _read_metadata(file_path)
+    if 'error' not in metadata:
+        # Failures may be transient, so only successful reads are kept
+        with _metadata_cache_lock:
+            _metadata_cache[key] = metadata
+            if len(_metadata_cache) > _METADATA_CACHE_SIZE:
+                _metadata_cache.popitem(last=False)
+    return dict(metadata)
+
+@dataclass(slots=True)
 class ImageModel:
     """
     Model representing an image in the photo gallery system.
@@ -14,7 +150,9 @@ class ImageModel:
     Attributes:
         id: Unique identifier for the image
         file_path: Path to the image file
-        md5_checksum: MD5 hash of the image file
+        md5_checksum: Hex digest of the image file, used for deduplication;
+            named after the database column, it holds a digest of
+            hash_algorithm, which need not be MD5
         reference_code: Unique reference code for the image
         imported_at: Timestamp when the image was imported
         metadata: Dictionary containing image metadata
@@ -22,6 +160,10 @@ class ImageModel:
         project_path: Optional path within the project structure
         last_accessed: Timestamp of last access
         file_size: Size of the image file in bytes
+        hash_algorithm: Algorithm md5_checksum was computed with
+        mtime_ns: Modification time of the file when md5_checksum was last
+            confirmed; together with file_size it lets verify_checksum
+            skip rehashing unchanged files
     """
     id: int
     file_path: str
@@ -33,6 +175,8 @@ class ImageModel:
     project_path: Optional[str] = None
     last_accessed: Optional[datetime] = None
     file_size: Optional[int] = None
+    hash_algorithm: str = "md5"
+    mtime_ns: Optional[int] = None
 
     def __post_init__(self):
         """Validate image attributes after initialization."""
@@ -48,13 +192,21 @@ class ImageModel:
         if not self.reference_code or not isinstance(self.reference_code, str):
             raise ValueError("Reference code must be a non-empty string")
         
-        # Update file size if file exists
-        if os.path.exists(self.file_path):
-            self.file_size = os.path.getsize(self.file_path)
-            self.last_accessed = datetime.fromtimestamp(os.path.getatime(self.file_path))
+        # Update file size if file exists; one stat covers size and atime
+        try:
+            st = os.stat(self.file_path)
+        except (OSError, ValueError):
+            st = None
+        if st is not None:
+            # Once md5_checksum is tied to a (size, mtime) signature the
+            # recorded size must not drift from it
+            if self.mtime_ns is None:
+                self.file_size = st.st_size
+            self.last_accessed = datetime.fromtimestamp(st.st_atime)
 
     @classmethod
-    def from_file(cls, file_path: str, id: int, reference_code: str) -> 'ImageModel':
+    def from_file(cls, file_path: str, id: int, reference_code: str,
+                  hash_algorithm: str = DEFAULT_ALGORITHM) -> 'ImageModel':
         """
         Create an ImageModel instance from a file.
         
@@ -62,6 +214,8 @@ class ImageModel:
             file_path: Path to the image file
             id: Unique identifier for the image
             reference_code: Reference code for the image
+            hash_algorithm: Algorithm for the content hash; use the
+                gallery's DBManager.hash_algorithm so hashes stay comparable
             
         Returns:
             New ImageModel instance
@@ -69,58 +223,64 @@ class ImageModel:
         Raises:
             ValueError: If file doesn't exist or isn't a valid image
         """
-        if not os.path.exists(file_path):
+        # Stat before hashing: if the file changes mid-hash its mtime moves
+        # past the recorded one and the next verification rehashes
+        try:
+            st = os.stat(file_path)
+        except (OSError, ValueError):
             raise ValueError(f"File not found: {file_path}")
 
-        # Calculate MD5 checksum
-        hash_md5 = hashlib.md5()
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
-        md5_checksum = hash_md5.hexdigest()
+        # Calculate content hash
+        md5_checksum = hash_file(file_path, hash_algorithm)
 
-        # Extract metadata
-        metadata = {}
+        # Extract metadata; cached, so a later update_metadata() is free
         try:
-            with Image.open(file_path) as img:
-                metadata['format'] = img.format
-                metadata['mode'] = img.mode
-                metadata['size'] = img.size
-                
-                if hasattr(img, '_getexif') and img._getexif():
-                    exif = img._getexif()
-                    for tag_id in exif:
-                        try:
-                            tag = TAGS.get(tag_id, tag_id)
-                            metadata[tag] = str(exif[tag_id])
-                        except:
-                            continue
-        except Exception as e:
-            metadata['error'] = str(e)
+            metadata = _extract_metadata(file_path)
+        except OSError as e:
+            metadata = {'error': str(e)}
 
         return cls(
             id=id,
             file_path=file_path,
             md5_checksum=md5_checksum,
             reference_code=reference_code,
-            metadata=metadata
+            metadata=metadata,
+            file_size=st.st_size,
+            hash_algorithm=hash_algorithm,
+            mtime_ns=st.st_mtime_ns
         )
 
-    def verify_checksum(self) -> bool:
+    def verify_checksum(self, strict: bool = False) -> bool:
         """
-        Verify that the file's current MD5 matches the stored checksum.
+        Verify that the file's current content hash matches the stored one.
+
+        A file whose size and modification time still match the values
+        recorded when the hash was last confirmed is accepted without
+        reading it.
         
+        Args:
+            strict: Always rehash the file, ignoring the size/mtime match
+            
         Returns:
             True if checksums match, False otherwise
         """
-        if not os.path.exists(self.file_path):
+        try:
+            st = os.stat(self.file_path)
+        except (OSError, ValueError):
             return False
 
-        hash_md5 = hashlib.md5()
-        with open(self.file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest() == self.md5_checksum
+        if (not strict and self.mtime_ns is not None
+                and st.st_mtime_ns == self.mtime_ns and st.st_size == self.file_size):
+            return True
+
+        try:
+            matches = hash_file(self.file_path, self.hash_algorithm) == self.md5_checksum
+        except OSError:
+            return False
+        if matches:
+            self.file_size = st.st_size
+            self.mtime_ns = st.st_mtime_ns
+        return matches
 
     def update_metadata(self) -> None:
         """Update metadata from the current image file."""
@@ -128,20 +288,8 @@ class ImageModel:
             raise FileNotFoundError(f"Image file not found: {self.file_path}")
 
         try:
-            with Image.open(self.file_path) as img:
-                self.metadata['format'] = img.format
-                self.metadata['mode'] = img.mode
-                self.metadata['size'] = img.size
-                
-                if hasattr(img, '_getexif') and img._getexif():
-                    exif = img._getexif()
-                    for tag_id in exif:
-                        try:
-                            tag = TAGS.get(tag_id, tag_id)
-                            self.metadata[tag] = str(exif[tag_id])
-                        except:
-                            continue
-        except Exception as e:
+            self.metadata.update(_extract_metadata(self.file_path))
+        except OSError as e:
             self.metadata['error'] = str(e)
 
     def add_tag(self, tag_id: int) -> None:
@@ -160,29 +308,35 @@ class ImageModel:
             'id': self.id,
             'file_path': self.file_path,
             'md5_checksum': self.md5_checksum,
+            'hash_algorithm': self.hash_algorithm,
             'reference_code': self.reference_code,
             'imported_at': self.imported_at.isoformat(),
             'metadata': self.metadata,
             'tags': self.tags,
             'project_path': self.project_path,
             'last_accessed': self.last_accessed.isoformat() if self.last_accessed else None,
-            'file_size': self.file_size
+            'file_size': self.file_size,
+            'mtime_ns': self.mtime_ns
         }
 
     @classmethod
     def from_dict(cls, data: dict) -> 'ImageModel':
         """Create an image model from a dictionary."""
+        get = data.get
+        last_accessed = get('last_accessed')
         return cls(
             id=data['id'],
             file_path=data['file_path'],
             md5_checksum=data['md5_checksum'],
             reference_code=data['reference_code'],
-            imported_at=datetime.fromisoformat(data['imported_at']),
-            metadata=data.get('metadata', {}),
-            tags=data.get('tags', []),
-            project_path=data.get('project_path'),
-            last_accessed=datetime.fromisoformat(data['last_accessed']) if data.get('last_accessed') else None,
-            file_size=data.get('file_size')
+            imported_at=_fromisoformat(data['imported_at']),
+            metadata=get('metadata', {}),
+            tags=get('tags', []),
+            project_path=get('project_path'),
+            last_accessed=_fromisoformat(last_accessed) if last_accessed else None,
+            file_size=get('file_size'),
+            hash_algorithm=get('hash_algorithm', 'md5'),
+            mtime_ns=get('mtime_ns')
         )
 
     def __str__(self) -> str:
@@ -190,3 +344,46 @@ class ImageModel:
         return (f"Image {self.reference_code} "
                 f"({os.path.basename(self.file_path)}, "
                 f"{len(self.tags)} tags)")
+
+_FIELD_NAMES = tuple(f.name for f in fields(ImageModel))
+
+def _json_default(value: Any) -> Any:
+    """Encode datetimes for the stdlib encoder."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps_images(images: List[ImageModel]) -> bytes:
+    """
+    Serialize image models to a JSON array in one pass.
+
+    With orjson the dataclasses and their datetimes are encoded natively in
+    C, with no intermediate to_dict() per image. The output is readable by
+    loads_images() and ImageModel.from_dict().
+
+    Args:
+        images: Image models to serialize
+
+    Returns:
+        UTF-8 encoded JSON
+    """
+    if orjson is not None:
+        return orjson.dumps(images, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        [{name: getattr(image, name) for name in _FIELD_NAMES} for image in images],
+        default=_json_default
+    ).encode()
+
+def loads_images(data: bytes) -> List[ImageModel]:
+    """
+    Deserialize image models written by dumps_images().
+
+    Args:
+        data: JSON array of image records
+
+    Returns:
+        List of image models
+    """
+    records = orjson.loads(data) if orjson is not None else json.loads(data)
+    from_dict = ImageModel.from_dict
+    return [from_dict(record) for record in records]
@@ -0,0 +1,122 @@
+from typing import Any, Dict, List, Optional, Sequence
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+class ImageTableModel(QAbstractTableModel):
+    """
+    Read-only table model over the gallery's image columns.
+
+    Data is held column-wise, as returned by
+    DBManager.get_image_table_columns(), so data() is a single index into
+    a flat sequence and no per-cell item objects exist.
+    """
+
+    HEADERS = ["ID", "File Path", "Reference Code", "Tags"]
+    COLUMNS = ["id", "file_path", "reference_code", "tag_names"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._columns: List[Sequence] = [[] for _ in self.COLUMNS]
+        self._ids: Sequence[int] = self._columns[0]
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._ids)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+
+        value = self._columns[index.column()][index.row()]
+        return value if isinstance(value, str) else str(value)
+
+    def headerData(self, section: int, orientation: Qt.Orientation,
+                   role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def set_columns(self, columns: Dict[str, Sequence]) -> None:
+        """
+        Replace the table contents.
+
+        Args:
+            columns: Per-column sequences as returned by
+                DBManager.get_image_table_columns()
+        """
+        self.beginResetModel()
+        self._ids = columns['id']
+        self._columns = [columns[name] for name in self.COLUMNS]
+        self.endResetModel()
+
+    def update_rows(self, columns: Dict[str, Sequence]) -> None:
+        """
+        Refresh the rows of some images in place.
+
+        Images not currently shown are ignored, so a search result keeps
+        showing only its matches.
+
+        Args:
+            columns: Per-column sequences for the images to refresh, as
+                returned by DBManager.get_image_table_columns(image_ids)
+        """
+        last = len(self.COLUMNS) - 1
+        for i, image_id in enumerate(columns['id']):
+            row = self._row_of(image_id)
+            if row is None:
+                continue
+            for values, name in zip(self._columns, self.COLUMNS):
+                values[row] = columns[name][i]
+            self.dataChanged.emit(self.index(row, 0), self.index(row, last))
+
+    def remove_image(self, image_id: int) -> None:
+        """
+        Remove an image's row, if it is shown.
+
+        Args:
+            image_id: ID of the image
+        """
+        row = self._row_of(image_id)
+        if row is None:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        # _ids is the 'id' column itself, so it shrinks along with the rest
+        for values in self._columns:
+            del values[row]
+        self.endRemoveRows()
+
+    def _row_of(self, image_id: int) -> Optional[int]:
+        try:
+            return self._ids.index(image_id)
+        except ValueError:
+            return None
+
+    def image_id(self, row: int) -> Optional[int]:
+        """
+        Get the ID of the image shown in a row.
+
+        Args:
+            row: Row number
+
+        Returns:
+            Image ID, or None if the row is out of range
+        """
+        if 0 <= row < len(self._ids):
+            return self._ids[row]
+        return None
+
+    def value(self, row: int, column: str) -> Any:
+        """
+        Get the raw value of a cell.
+
+        Args:
+            row: Row number
+            column: Column name, one of COLUMNS
+
+        Returns:
+            Cell value, or None if the row is out of range
+        """
+        if 0 <= row < len(self._ids):
+            return self._columns[self.COLUMNS.index(column)][row]
+        return None
@@ -1,25 +1,35 @@
 import sys
 import os
-import json
-import hashlib
+import threading
+from functools import partial
+from itertools import chain
 from typing import Optional, List, Dict, Any
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
-    QFileDialog, QLabel, QListWidget, QListWidgetItem, QTableWidget, QTableWidgetItem,
+    QFileDialog, QLabel, QListWidget, QListWidgetItem, QTableView,
     QTabWidget, QLineEdit, QMessageBox, QStatusBar, QComboBox, QProgressDialog, QTreeWidget,
     QTreeWidgetItem, QInputDialog, QAbstractItemView, QScrollArea, QFormLayout, QSpinBox,
     QDoubleSpinBox, QDialog, QDialogButtonBox
 )
-from PyQt6.QtCore import Qt, QDateTime
-from PyQt6.QtGui import QFont, QPixmap
+from PyQt6.QtCore import Qt, QDateTime, QTimer, QObject, QRunnable, QThreadPool, pyqtSignal
+from PyQt6.QtGui import QFont, QPixmap, QPixmapCache
 from db_manager import DBManager, DBError
+from image_table_model import ImageTableModel
+from checksum import HashCache
+from config_service import read_config, write_config
 from reference_service import ReferenceService
 from watermark_service import WatermarkService
 from social_media_service import SocialMediaService
 from PIL import Image as PILImage
 from PIL.ExifTags import TAGS
 
-CONFIG_FILE = "config.json"
+# IFD0 tag pointing at the Exif sub-IFD
+_EXIF_IFD_POINTER = 0x8769
+
+# Edge length of the view-tab preview, and the QPixmapCache budget (KiB)
+# for the scaled previews kept so reselecting an image skips the decode
+DETAIL_PREVIEW_SIZE = 400
+PIXMAP_CACHE_LIMIT_KB = 64 * 1024
 
 class SettingsDialog(QDialog):
     def __init__(self, parent=None, config=None):
@@ -74,6 +84,41 @@ class SettingsDialog(QDialog):
             "reference_prefix": self.reference_prefix_input.text(),
         }
 
+class HashWorkerSignals(QObject):
+    # index, digest, and the (size, mtime_ns) it was computed at, or None if it was cached
+    finished = pyqtSignal(int, str, object)
+    error = pyqtSignal(int, str)
+
+class HashWorker(QRunnable):
+    """
+    Hashes one file on a pool thread and reports back through signals.
+
+    Workers never touch the database; newly computed hashes travel back
+    with the result and are stored by the GUI thread.
+    """
+
+    def __init__(self, index: int, file_path: str, hash_cache: HashCache, algorithm: str,
+                 cancel_event: threading.Event):
+        super().__init__()
+        self.index = index
+        self.file_path = file_path
+        self.hash_cache = hash_cache
+        self.algorithm = algorithm
+        self.cancel_event = cancel_event
+        self.signals = HashWorkerSignals()
+
+    def run(self):
+        # A single hash call can't be interrupted, so cancellation is
+        # checked before the file is opened
+        if self.cancel_event.is_set():
+            return
+        try:
+            checksum, computed = self.hash_cache.hash_file_entry(self.file_path, self.algorithm)
+        except Exception as e:
+            self.signals.error.emit(self.index, str(e))
+        else:
+            self.signals.finished.emit(self.index, checksum, computed)
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -96,6 +141,25 @@ class MainWindow(QMainWindow):
             QMessageBox.critical(self, "Database Error", str(e))
             sys.exit(1)
 
+        # Re-imports hash the same files again; unchanged ones are looked up
+        self.hash_cache = HashCache()
+
+        QPixmapCache.setCacheLimit(PIXMAP_CACHE_LIMIT_KB)
+
+        # Files are hashed on the pool while the GUI keeps repainting. It is
+        # the import's own, so sizing or clearing it leaves other work alone
+        self.hash_pool = QThreadPool(self)
+        self.hash_pool.setMaxThreadCount(os.cpu_count() or 1)
+        self._import_cancel = threading.Event()
+        self._import_cancel.set()
+
+        # Coalesce bursts of stats refresh requests into one query
+        self.stats_timer = QTimer(self)
+        self.stats_timer.setSingleShot(True)
+        self.stats_timer.setInterval(100)
+        self.stats_timer.timeout.connect(self._refresh_stats)
+        self._stats_dirty = True
+
         # Initialize UI components
         self._setup_ui()
 
@@ -136,6 +200,7 @@ class MainWindow(QMainWindow):
         self.settings_tab = QWidget()
         self._setup_settings_tab()
         self.tabs.addTab(self.settings_tab, "Settings")
+        self.tabs.currentChanged.connect(self._on_tab_changed)
 
         # Status Bar
         self.status_bar = QStatusBar()
@@ -180,26 +245,107 @@ class MainWindow(QMainWindow):
             QMessageBox.information(self, "No Files", "No files selected for import.")
             return
 
-        progress = QProgressDialog("Importing images...", "Cancel", 0, len(files), self)
-        progress.setWindowModality(Qt.WindowModality.WindowModal)
-        progress.show()
+        # Each import gets its own cancel event; results from workers of an
+        # earlier, cancelled import see their event set and are dropped
+        cancel_event = threading.Event()
+        self._import_cancel = cancel_event
+        self._import_files = files
+        self._import_checksums = [None] * len(files)
+        self._import_errors = {}
+        self._import_new_hashes = []
+        self._import_pending = len(files)
+
+        # Hashes stored by earlier runs are read here in one go, so the
+        # pool threads only ever hit the in-memory cache
+        algorithm = self.db_manager.hash_algorithm
+        try:
+            self.hash_cache.preload(algorithm, self.db_manager.get_cached_hashes(
+                [os.path.abspath(path) for path in files], algorithm))
+        except DBError as e:
+            self.status_bar.showMessage(f"Stored file hashes unavailable, rehashing: {e}")
+
+        self._import_progress = QProgressDialog("Importing images...", "Cancel", 0, len(files), self)
+        self._import_progress.setWindowModality(Qt.WindowModality.WindowModal)
+        self._import_progress.canceled.connect(self._cancel_import)
+        self._import_progress.show()
+
+        on_hashed = partial(self._on_file_hashed, cancel_event)
+        on_failed = partial(self._on_file_hash_failed, cancel_event)
+        for index, path in enumerate(files):
+            worker = HashWorker(index, path, self.hash_cache, algorithm, cancel_event)
+            worker.signals.finished.connect(on_hashed)
+            worker.signals.error.connect(on_failed)
+            self.hash_pool.start(worker)
+
+    def _on_file_hashed(self, cancel_event, index, checksum, computed):
+        if cancel_event.is_set():
+            return
+        self._import_checksums[index] = checksum
+        if computed is not None:
+            self._import_new_hashes.append(
+                (os.path.abspath(self._import_files[index]), self.db_manager.hash_algorithm,
+                 computed[0], computed[1], checksum))
+        self._file_hash_done()
+
+    def _on_file_hash_failed(self, cancel_event, index, message):
+        if cancel_event.is_set():
+            return
+        self._import_errors[index] = message
+        self._file_hash_done()
+
+    def _file_hash_done(self):
+        self._import_pending -= 1
+        self._import_progress.setValue(len(self._import_files) - self._import_pending)
+        if self._import_pending == 0:
+            self._finish_import()
 
+    def _cancel_import(self):
+        if self._import_cancel.is_set():
+            return
+        self.hash_pool.clear()
+        self._finish_import()
+
+    def _finish_import(self):
+        # Setting the event first also keeps the dialog's close from
+        # re-entering through _cancel_import
+        self._import_cancel.set()
+        self._import_progress.close()
+
+        # Process in selection order so duplicates and reference codes
+        # don't depend on which file finished hashing first
         imported_count = 0
-        for i, path in enumerate(files):
-            if progress.wasCanceled():
-                break
-            try:
-                md5 = self.compute_md5(path)
-                if not self.db_manager.get_image_by_md5(md5):
-                    ref_code = self.reference_service.generate_ordered_code()
-                    self.db_manager.add_image(path, md5, ref_code)
-                    imported_count += 1
-            except Exception as e:
-                self.status_bar.showMessage(f"Error importing {path}: {str(e)}")
-            progress.setValue(i + 1)
-
-        progress.close()
-        self.status_bar.showMessage(f"Imported {imported_count} images.")
+        try:
+            # Checksums already in the gallery, found with one query per chunk
+            seen_checksums = self.db_manager.get_existing_checksums(
+                [md5 for md5 in self._import_checksums if md5 is not None])
+
+            new_images = []
+            for index, path in enumerate(self._import_files):
+                if index in self._import_errors:
+                    self.status_bar.showMessage(f"Error importing {path}: {self._import_errors[index]}")
+                    continue
+                md5 = self._import_checksums[index]
+                if md5 is None:
+                    break
+                if md5 not in seen_checksums:
+                    seen_checksums.add(md5)
+                    new_images.append((path, md5))
+
+            ref_codes = self.reference_service.generate_ordered_codes(len(new_images))
+            imported_count = len(self.db_manager.add_images_bulk(
+                [(path, md5, ref_code, None) for (path, md5), ref_code in zip(new_images, ref_codes)]))
+        except DBError as e:
+            QMessageBox.warning(self, "Database Error", str(e))
+
+        message = f"Imported {imported_count} images."
+        try:
+            self.db_manager.set_cached_hashes(self._import_new_hashes)
+        except DBError as e:
+            # Only costs a rehash of these files next time
+            message += f" File hashes could not be stored: {e}"
+        self._import_new_hashes = []
+
+        self.status_bar.showMessage(message)
         self.import_list.clear()
         self.refresh_db_table()
         self.update_stats()
@@ -207,33 +353,31 @@ class MainWindow(QMainWindow):
     def _setup_database_tab(self):
         layout = QVBoxLayout(self.database_tab)
 
-        self.db_table = QTableWidget()
-        self.db_table.setColumnCount(4)
-        self.db_table.setHorizontalHeaderLabels(["ID", "File Path", "Reference Code", "Tags"])
-        self.db_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-        self.db_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.db_table.cellClicked.connect(self.on_db_table_cell_clicked)
+        self.db_model = ImageTableModel(self)
+        self.db_table = QTableView()
+        self.db_table.setModel(self.db_model)
+        self.db_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.db_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.db_table.clicked.connect(self.on_db_table_cell_clicked)
         layout.addWidget(self.db_table)
 
     def refresh_db_table(self):
         try:
-            images_with_tags = self.db_manager.get_all_images_with_tags()
-            self.db_table.setRowCount(len(images_with_tags))
-            for row, (image, tags) in enumerate(images_with_tags):
-                self.db_table.setItem(row, 0, QTableWidgetItem(str(image['id'])))
-                file_path = image.get('project_path') or (image.get('locations') or [''])[0]
-                self.db_table.setItem(row, 1, QTableWidgetItem(file_path))
-                self.db_table.setItem(row, 2, QTableWidgetItem(image.get('reference_code', '')))
-                tag_names = ", ".join(tag['name'] for tag in tags)
-                self.db_table.setItem(row, 3, QTableWidgetItem(tag_names))
+            self.db_model.set_columns(self.db_manager.get_image_table_columns())
         except DBError as e:
             QMessageBox.warning(self, "Database Error", str(e))
 
-    def on_db_table_cell_clicked(self, row, column):
-        image_id_item = self.db_table.item(row, 0)
-        if not image_id_item:
+    def refresh_db_rows(self, image_ids: List[int]):
+        # Single-image edits re-read just their rows instead of the whole table
+        try:
+            self.db_model.update_rows(self.db_manager.get_image_table_columns(image_ids))
+        except DBError as e:
+            QMessageBox.warning(self, "Database Error", str(e))
+
+    def on_db_table_cell_clicked(self, index):
+        image_id = self.db_model.image_id(index.row())
+        if image_id is None:
             return
-        image_id = int(image_id_item.text())
         self.load_image_details(image_id)
 
     def _setup_view_tab(self):
@@ -269,19 +413,17 @@ class MainWindow(QMainWindow):
 
     def load_image_details(self, image_id: int):
         try:
-            images_with_tags = self.db_manager.get_all_images_with_tags()
-            image_data = next((img for img, _ in images_with_tags if img['id'] == image_id), None)
-            tags = next((t for img, t in images_with_tags if img['id'] == image_id), [])
-            if not image_data:
+            image_with_tags = self.db_manager.get_image_with_tags(image_id)
+            if image_with_tags is None:
                 return
+            image_data, tags = image_with_tags
 
             self.current_view_image_id = image_id
 
             # Load image preview
             file_path = image_data.get('project_path') or (image_data.get('locations') or [''])[0]
-            if os.path.exists(file_path):
-                pixmap = QPixmap(file_path)
-                scaled_pixmap = pixmap.scaled(400, 400, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+            scaled_pixmap = self._detail_preview(image_id, file_path)
+            if scaled_pixmap is not None:
                 self.preview_label.setPixmap(scaled_pixmap)
             else:
                 self.preview_label.setText("Image file not found.")
@@ -291,20 +433,30 @@ class MainWindow(QMainWindow):
             try:
                 with PILImage.open(file_path) as img:
                     info_item = QTreeWidgetItem(["Image Info"])
-                    self.metadata_tree.addTopLevelItem(info_item)
-                    info_item.addChild(QTreeWidgetItem(["Format", img.format]))
-                    info_item.addChild(QTreeWidgetItem(["Size", f"{img.width} x {img.height}"]))
-                    info_item.addChild(QTreeWidgetItem(["Mode", img.mode]))
-
-                    exif = img._getexif()
+                    info_item.addChildren([
+                        QTreeWidgetItem(["Format", img.format]),
+                        QTreeWidgetItem(["Size", f"{img.width} x {img.height}"]),
+                        QTreeWidgetItem(["Mode", img.mode]),
+                    ])
+                    top_items = [info_item]
+
+                    exif = img.getexif()
                     if exif:
                         exif_item = QTreeWidgetItem(["EXIF Data"])
-                        self.metadata_tree.addTopLevelItem(exif_item)
-                        for tag_id, value in exif.items():
-                            tag = TAGS.get(tag_id, str(tag_id))
-                            exif_item.addChild(QTreeWidgetItem([tag, str(value)]))
+                        exif_item.addChildren([
+                            QTreeWidgetItem([TAGS.get(tag_id, str(tag_id)), str(value)])
+                            for tag_id, value in chain(exif.items(), exif.get_ifd(_EXIF_IFD_POINTER).items())
+                        ])
+                        top_items.append(exif_item)
             except Exception:
-                pass
+                top_items = []
+
+            # Attach the finished tree in one go rather than item by item
+            self.metadata_tree.setUpdatesEnabled(False)
+            try:
+                self.metadata_tree.addTopLevelItems(top_items)
+            finally:
+                self.metadata_tree.setUpdatesEnabled(True)
 
             # Load tags
             self.tag_list.clear()
@@ -315,6 +467,22 @@ class MainWindow(QMainWindow):
         except DBError as e:
             QMessageBox.warning(self, "Database Error", str(e))
 
+    def _detail_preview(self, image_id: int, file_path: str) -> Optional[QPixmap]:
+        try:
+            mtime = os.stat(file_path).st_mtime_ns
+        except OSError:
+            return None
+
+        # Keyed by file and mtime as well, so a moved or edited file is redecoded
+        key = f"detail:{image_id}:{mtime}:{file_path}"
+        scaled_pixmap = QPixmapCache.find(key)
+        if scaled_pixmap is None:
+            scaled_pixmap = QPixmap(file_path).scaled(
+                DETAIL_PREVIEW_SIZE, DETAIL_PREVIEW_SIZE,
+                Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+            QPixmapCache.insert(key, scaled_pixmap)
+        return scaled_pixmap
+
     def add_tag_to_selected_image(self):
         if self.current_view_image_id is None:
             QMessageBox.information(self, "No Image Selected", "Please select an image first.")
@@ -322,9 +490,9 @@ class MainWindow(QMainWindow):
         tag, ok = QInputDialog.getText(self, "Add Tag", "Enter tag name:")
         if ok and tag:
             try:
-                tag_id = self.db_manager.add_tag(tag)
-                self.db_manager.add_tag_to_image(self.current_view_image_id, tag_id)
+                self.db_manager.add_tags_and_link(self.current_view_image_id, [tag])
                 self.load_image_details(self.current_view_image_id)
+                self.refresh_db_rows([self.current_view_image_id])
                 self.update_stats()
             except DBError as e:
                 QMessageBox.warning(self, "Database Error", str(e))
@@ -345,6 +513,7 @@ class MainWindow(QMainWindow):
                 return
             self.db_manager.remove_tag_from_image(self.current_view_image_id, tag_id)
             self.load_image_details(self.current_view_image_id)
+            self.refresh_db_rows([self.current_view_image_id])
             self.update_stats()
         except DBError as e:
             QMessageBox.warning(self, "Database Error", str(e))
@@ -359,22 +528,30 @@ class MainWindow(QMainWindow):
         layout.addWidget(self.operations_list)
 
     def update_stats(self):
+        # The stats are only shown on the overview tab; while it's hidden,
+        # just note that they're stale and query once it's opened
+        if self.tabs.currentWidget() is not self.overview_tab:
+            self._stats_dirty = True
+            return
+        self.stats_timer.start()
+
+    def _on_tab_changed(self, index):
+        if self._stats_dirty and self.tabs.widget(index) is self.overview_tab:
+            self._stats_dirty = False
+            self.stats_timer.start()
+
+    def _refresh_stats(self):
         try:
-            total_images = self.db_table.rowCount()
-            tagged_images = 0
-            for row in range(total_images):
-                tags_item = self.db_table.item(row, 3)
-                if tags_item and tags_item.text().strip():
-                    tagged_images += 1
+            stats = self.db_manager.stats()
             recent_ops = self.operations_list.count()
 
             stats_text = (
-                f"Total Images: {total_images}\n"
-                f"Tagged Images: {tagged_images}\n"
+                f"Total Images: {stats['total']}\n"
+                f"Tagged Images: {stats['tagged']}\n"
                 f"Recent Operations: {recent_ops}"
             )
             self.stats_label.setText(stats_text)
-        except Exception as e:
+        except DBError as e:
             self.status_bar.showMessage(f"Error updating stats: {str(e)}")
 
     def _setup_settings_tab(self):
@@ -419,8 +596,7 @@ class MainWindow(QMainWindow):
         self.config["reference_prefix"] = self.reference_prefix_input.text()
 
         try:
-            with open(CONFIG_FILE, "w") as f:
-                json.dump(self.config, f, indent=4)
+            write_config(self.config)
             QMessageBox.information(self, "Settings Saved", "Settings have been saved successfully.")
             # Update services with new settings
             self.reference_service.prefix = self.config["reference_prefix"]
@@ -430,20 +606,10 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Save Error", f"Failed to save settings: {str(e)}")
 
     def compute_md5(self, file_path: str) -> str:
-        hash_md5 = hashlib.md5()
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
+        return self.hash_cache.hash_file(file_path, self.db_manager.hash_algorithm)
 
     def load_config_file(self) -> Dict[str, Any]:
-        if os.path.exists(CONFIG_FILE):
-            try:
-                with open(CONFIG_FILE, "r") as f:
-                    return json.load(f)
-            except Exception:
-                return {}
-        return {}
+        return read_config()
 
     def load_config(self):
         # This method is kept for backward compatibility, but config is loaded in __init__
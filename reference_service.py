@@ -1,5 +1,5 @@
 import uuid
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 class ReferenceService:
@@ -35,11 +35,7 @@ class ReferenceService:
         Returns:
             Reference code string
         """
-        # Reset counter if it's a new day
-        current_date = datetime.now().date()
-        if current_date != self._last_reset:
-            self.counter = 0
-            self._last_reset = current_date
+        self._reset_if_new_day()
         
         self.counter += 1
         
@@ -47,6 +43,35 @@ class ReferenceService:
             return f"{date_prefix}-{self.prefix}-{self.counter:06d}"
         return f"{self.prefix}-{self.counter:06d}"
 
+    def generate_ordered_codes(self, count: int, date_prefix: Optional[str] = None) -> List[str]:
+        """
+        Generate several consecutive ordered reference codes.
+        
+        Same as calling generate_ordered_code() count times, except that the
+        date is read once for the whole batch.
+        
+        Args:
+            count: Number of codes to generate
+            date_prefix: Optional date string to prefix the codes
+            
+        Returns:
+            List of reference code strings, in order
+        """
+        self._reset_if_new_day()
+        
+        start = self.counter + 1
+        self.counter += count
+        
+        prefix = f"{date_prefix}-{self.prefix}" if date_prefix else self.prefix
+        return [f"{prefix}-{number:06d}" for number in range(start, self.counter + 1)]
+
+    def _reset_if_new_day(self) -> None:
+        """Reset the counter if the date changed since it was last reset."""
+        current_date = datetime.now().date()
+        if current_date != self._last_reset:
+            self.counter = 0
+            self._last_reset = current_date
+
     def generate_timestamp_code(self) -> str:
         """
         Generate a reference code based on current timestamp.
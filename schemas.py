@@ -1,11 +1,89 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Iterable, Iterator, Optional, Any, Set, Tuple
 from datetime import datetime
+from functools import lru_cache
+from itertools import chain
 import os
+import json
 from PIL import Image as PILImage
 from PIL.ExifTags import TAGS
 
-@dataclass
+try:
+    import orjson
+except ImportError:  # orjson is optional; images are serialized via to_dict() without it
+    orjson = None
+
+# IFD0 tag pointing at the Exif sub-IFD
+_EXIF_IFD_POINTER = 0x8769
+
+# TAGS.get, looked up once rather than per EXIF tag
+_TAG_NAME = TAGS.get
+
+# Records from one import or export share timestamps; parse each string once
+_fromisoformat = lru_cache(maxsize=65536)(datetime.fromisoformat)
+
+# Set while loading records this module wrote itself, which are known valid
+_SKIP_VALIDATION: ContextVar[bool] = ContextVar('skip_validation', default=False)
+
+@contextmanager
+def skip_validation() -> Iterator[None]:
+    """
+    Skip the __post_init__ checks of objects created inside the block.
+
+    Only for trusted data, such as records written by dumps_images() or
+    read back from the database.
+    """
+    token = _SKIP_VALIDATION.set(True)
+    try:
+        yield
+    finally:
+        _SKIP_VALIDATION.reset(token)
+
+def _list_directory(directory: str) -> Set[str]:
+    """
+    Get the names of the existing entries of a directory.
+
+    Args:
+        directory: Directory to list
+
+    Returns:
+        Entry names, without dangling symlinks; empty if it can't be listed
+    """
+    try:
+        with os.scandir(directory or '.') as it:
+            return {entry.name for entry in it
+                    if not entry.is_symlink() or os.path.exists(entry.path)}
+    except OSError:
+        return set()
+
+@lru_cache(maxsize=4096)
+def _read_metadata(file_path: str, mtime_ns: int, size: int) -> Tuple[Tuple[Any, Any], ...]:
+    """
+    Read an image file's format, mode, size and EXIF tags.
+
+    Memoized on the file's modification time and size as well as its path,
+    so refreshing the metadata of an unchanged file doesn't reopen it.
+
+    Args:
+        file_path: Path to the image file
+        mtime_ns: File modification time in nanoseconds
+        size: File size in bytes
+
+    Returns:
+        (key, value) pairs, in the order they should be applied
+    """
+    with PILImage.open(file_path) as img:
+        items = [('format', img.format), ('mode', img.mode), ('size', img.size)]
+        exif = img.getexif()
+        tag_name, to_str = _TAG_NAME, str
+        items.extend((tag_name(tag_id, tag_id), to_str(value))
+                     for tag_id, value in chain(exif.items(), exif.get_ifd(_EXIF_IFD_POINTER).items()))
+    # A tuple, so callers can't mutate the cached value
+    return tuple(items)
+
+@dataclass(slots=True)
 class ImageLocation:
     """
     Represents a physical location of an image file in the system.
@@ -27,6 +105,9 @@ class ImageLocation:
 
     def __post_init__(self):
         """Validate location attributes after initialization."""
+        if _SKIP_VALIDATION.get():
+            return
+
         if not isinstance(self.id, int):
             raise ValueError("Location ID must be an integer")
         
@@ -40,10 +121,18 @@ class ImageLocation:
         Returns:
             True if file exists, False otherwise
         """
-        exists = os.path.exists(self.file_path)
+        try:
+            os.stat(self.file_path)
+            exists = True
+        except (OSError, ValueError):
+            exists = False
+        self._set_verified(exists)
+        return exists
+
+    def _set_verified(self, exists: bool) -> None:
+        """Record the outcome of a verification."""
         self.is_verified = exists
         self.last_verified = datetime.now()
-        return exists
 
     def to_dict(self) -> dict:
         """Convert the location to a dictionary."""
@@ -57,18 +146,18 @@ class ImageLocation:
         }
 
     @classmethod
-    def from_dict(cls, data: dict) -> 'ImageLocation':
-        """Create a location from a dictionary."""
+    def from_dict(cls, data: dict, now: Optional[datetime] = None) -> 'ImageLocation':
+        """Create a location from a dictionary, using now for a missing created_at."""
         return cls(
             id=data['id'],
             file_path=data['file_path'],
             is_in_project_folder=data['is_in_project_folder'],
-            last_verified=datetime.fromisoformat(data['last_verified']),
+            last_verified=_fromisoformat(data['last_verified']),
             is_verified=data.get('is_verified', True),
-            created_at=datetime.fromisoformat(data.get('created_at', datetime.now().isoformat()))
+            created_at=_fromisoformat(data['created_at']) if 'created_at' in data else now or datetime.now()
         )
 
-@dataclass
+@dataclass(slots=True)
 class Image:
     """
     Represents an image in the system with its metadata and locations.
@@ -96,6 +185,9 @@ class Image:
 
     def __post_init__(self):
         """Validate image attributes after initialization."""
+        if _SKIP_VALIDATION.get():
+            return
+
         if not isinstance(self.id, int):
             raise ValueError("Image ID must be an integer")
         
@@ -105,32 +197,38 @@ class Image:
         if not self.reference_code or not isinstance(self.reference_code, str):
             raise ValueError("Reference code must be a non-empty string")
 
-    def update_metadata(self, file_path: str) -> None:
+    def update_metadata(self, file_path: str, cache: Any = None) -> None:
         """
         Update metadata from the specified image file.
         
         Args:
             file_path: Path to the image file
+            cache: Optional persistent store, such as DBManager, with
+                get_cached_metadata(path, mtime_ns, size) and
+                set_cached_metadata(path, mtime_ns, size, metadata); it is
+                consulted before the file is opened and errors in it are ignored
         """
-        if not os.path.exists(file_path):
+        try:
+            st = os.stat(file_path)
+        except OSError:
             raise FileNotFoundError(f"Image file not found: {file_path}")
 
         try:
-            with PILImage.open(file_path) as img:
-                self.metadata['format'] = img.format
-                self.metadata['mode'] = img.mode
-                self.metadata['size'] = img.size
-                
-                if hasattr(img, '_getexif') and img._getexif():
-                    exif = img._getexif()
-                    for tag_id in exif:
-                        try:
-                            tag = TAGS.get(tag_id, tag_id)
-                            self.metadata[tag] = str(exif[tag_id])
-                        except:
-                            continue
-                            
-                self.updated_at = datetime.now()
+            metadata = None
+            if cache is not None:
+                try:
+                    metadata = cache.get_cached_metadata(file_path, st.st_mtime_ns, st.st_size)
+                except Exception:
+                    pass
+            if metadata is None:
+                metadata = dict(_read_metadata(file_path, st.st_mtime_ns, st.st_size))
+                if cache is not None:
+                    try:
+                        cache.set_cached_metadata(file_path, st.st_mtime_ns, st.st_size, metadata)
+                    except Exception:
+                        pass
+            self.metadata.update(metadata)
+            self.updated_at = datetime.now()
         except Exception as e:
             self.metadata['error'] = str(e)
 
@@ -153,11 +251,22 @@ class Image:
         Returns:
             List of valid locations
         """
-        valid_locations = []
+        by_dir: Dict[str, List[ImageLocation]] = {}
         for location in self.locations:
-            if location.verify():
-                valid_locations.append(location)
-        return valid_locations
+            by_dir.setdefault(os.path.dirname(location.file_path), []).append(location)
+
+        for directory, locations in by_dir.items():
+            # One listing covers every location in a directory; a lone
+            # location is cheaper to stat directly
+            names = _list_directory(directory) if len(locations) > 1 else set()
+            for location in locations:
+                if os.path.basename(location.file_path) in names:
+                    location._set_verified(True)
+                else:
+                    # Also confirms names a case-insensitive filesystem lists differently
+                    location.verify()
+
+        return [location for location in self.locations if location.is_verified]
 
     def to_dict(self) -> dict:
         """Convert the image to a dictionary."""
@@ -174,21 +283,40 @@ class Image:
         }
 
     @classmethod
-    def from_dict(cls, data: dict) -> 'Image':
-        """Create an image from a dictionary."""
+    def from_dict(cls, data: dict, now: Optional[datetime] = None) -> 'Image':
+        """Create an image from a dictionary, using now for missing timestamps."""
+        if now is None and ('created_at' not in data or 'updated_at' not in data):
+            now = datetime.now()
         return cls(
             id=data['id'],
             md5_checksum=data['md5_checksum'],
             reference_code=data['reference_code'],
-            imported_at=datetime.fromisoformat(data['imported_at']),
+            imported_at=_fromisoformat(data['imported_at']),
             project_path=data.get('project_path'),
             metadata=data.get('metadata', {}),
-            locations=[ImageLocation.from_dict(loc) for loc in data.get('locations', [])],
-            created_at=datetime.fromisoformat(data.get('created_at', datetime.now().isoformat())),
-            updated_at=datetime.fromisoformat(data.get('updated_at', datetime.now().isoformat()))
+            locations=[ImageLocation.from_dict(loc, now) for loc in data.get('locations', [])],
+            created_at=_fromisoformat(data['created_at']) if 'created_at' in data else now,
+            updated_at=_fromisoformat(data['updated_at']) if 'updated_at' in data else now
         )
 
-@dataclass
+    @classmethod
+    def from_dict_batch(cls, items: Iterable[dict]) -> List['Image']:
+        """
+        Create images from several dictionaries.
+
+        Missing timestamps all get the same moment, taken once for the
+        batch, rather than a fresh datetime.now() per record.
+
+        Args:
+            items: Dictionaries as produced by to_dict()
+
+        Returns:
+            The images, in the order given
+        """
+        now = datetime.now()
+        return [cls.from_dict(data, now) for data in items]
+
+@dataclass(slots=True, frozen=True)
 class Tag:
     """
     Represents a tag that can be applied to images.
@@ -206,6 +334,9 @@ class Tag:
 
     def __post_init__(self):
         """Validate tag attributes after initialization."""
+        if _SKIP_VALIDATION.get():
+            return
+
         if not isinstance(self.id, int):
             raise ValueError("Tag ID must be an integer")
         
@@ -234,34 +365,62 @@ class Tag:
             id=data['id'],
             name=data['name'],
             description=data.get('description'),
-            created_at=datetime.fromisoformat(data.get('created_at', datetime.now().isoformat()))
+            created_at=_fromisoformat(data['created_at']) if 'created_at' in data else datetime.now()
         )
 
-@dataclass
+@dataclass(slots=True)
 class ImageWithTags:
     """
     Represents an image with its associated tags.
     
     Attributes:
         image: The image object
-        tags: List of associated tags
+        tags: Associated tags, as a tuple so the lookup indexes can't be
+            bypassed; use add_tag() and remove_tag(), or assign a new
+            sequence, which is deduplicated and reindexed
     """
     image: Image
-    tags: List[Tag] = field(default_factory=list)
+    tags: Tuple[Tag, ...] = ()
+    # Tags are frozen, hence hashable; names are counted since distinct
+    # tags may share one
+    _tag_set: Set[Tag] = field(init=False, repr=False, compare=False)
+    _name_counts: Dict[str, int] = field(init=False, repr=False, compare=False)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Reindex whenever tags is assigned, including by __init__."""
+        if name != 'tags':
+            object.__setattr__(self, name, value)
+            return
+
+        # Repeated tags keep only their first occurrence, as add_tag() would
+        tags = tuple(dict.fromkeys(value))
+        name_counts: Dict[str, int] = {}
+        for tag in tags:
+            name_counts[tag.name] = name_counts.get(tag.name, 0) + 1
+        object.__setattr__(self, 'tags', tags)
+        object.__setattr__(self, '_tag_set', set(tags))
+        object.__setattr__(self, '_name_counts', name_counts)
 
     def add_tag(self, tag: Tag) -> None:
         """Add a tag to the image."""
-        if tag not in self.tags:
-            self.tags.append(tag)
+        if tag not in self._tag_set:
+            object.__setattr__(self, 'tags', self.tags + (tag,))
+            self._tag_set.add(tag)
+            self._name_counts[tag.name] = self._name_counts.get(tag.name, 0) + 1
 
     def remove_tag(self, tag: Tag) -> None:
         """Remove a tag from the image."""
-        if tag in self.tags:
-            self.tags.remove(tag)
+        if tag in self._tag_set:
+            object.__setattr__(self, 'tags', tuple(t for t in self.tags if t != tag))
+            self._tag_set.discard(tag)
+            if self._name_counts[tag.name] == 1:
+                del self._name_counts[tag.name]
+            else:
+                self._name_counts[tag.name] -= 1
 
     def has_tag(self, tag_name: str) -> bool:
         """Check if the image has a tag with the given name."""
-        return any(tag.name == tag_name for tag in self.tags)
+        return tag_name in self._name_counts
 
     def to_dict(self) -> dict:
         """Convert the image with tags to a dictionary."""
@@ -277,3 +436,35 @@ class ImageWithTags:
             image=Image.from_dict(data['image']),
             tags=[Tag.from_dict(tag) for tag in data.get('tags', [])]
         )
+
+def dumps_images(images: List[Image]) -> bytes:
+    """
+    Serialize images, with their locations, to a JSON array.
+
+    With orjson the dataclasses are walked and their datetimes formatted in
+    C, skipping the per-field to_dict() and isoformat() calls. Either way
+    the records match to_dict() and can be read back with loads_images().
+
+    Args:
+        images: Images to serialize
+
+    Returns:
+        UTF-8 encoded JSON
+    """
+    if orjson is not None:
+        return orjson.dumps(images, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps([image.to_dict() for image in images]).encode()
+
+def loads_images(data: bytes) -> List[Image]:
+    """
+    Deserialize images written by dumps_images().
+
+    Args:
+        data: JSON array of image records
+
+    Returns:
+        List of images
+    """
+    records = orjson.loads(data) if orjson is not None else json.loads(data)
+    with skip_validation():
+        return Image.from_dict_batch(records)
@@ -1,12 +1,18 @@
 import requests
-from typing import Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from typing import Optional, Dict, Any, List, Tuple
 from urllib.parse import urljoin
+from urllib3.util.retry import Retry
 
 class SocialMediaService:
     """Service for handling social media interactions, primarily Instagram."""
     
     API_VERSION = "v15.0"
     BASE_URL = "https://graph.facebook.com"
+    # Connections kept open to the Graph API; share_images() never runs
+    # more threads than this
+    POOL_MAXSIZE = 8
     
     def __init__(self, access_token: str, instagram_account_id: str):
         """
@@ -20,6 +26,24 @@ class SocialMediaService:
         self.instagram_account_id = instagram_account_id
         self.graph_api_url = urljoin(self.BASE_URL, self.API_VERSION)
 
+        # Reuse connections to the Graph API instead of a new TLS handshake
+        # per call; only idempotent requests are retried, so a POST that
+        # reached the server is never sent twice
+        self.session = requests.Session()
+        retries = Retry(total=3, backoff_factor=0.2, status_forcelist=[502, 503, 504])
+        self.session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=self.POOL_MAXSIZE,
+                                                   max_retries=retries))
+
+    def close(self) -> None:
+        """Close the pooled connections."""
+        self.session.close()
+
+    def __enter__(self) -> "SocialMediaService":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
     def _make_request(self, endpoint: str, params: Dict[str, Any], method: str = "POST") -> Optional[Dict[str, Any]]:
         """
         Make a request to the Instagram Graph API.
@@ -32,11 +56,12 @@ class SocialMediaService:
         Returns:
             Response data if successful, None otherwise
         """
+        response = None
         try:
             url = f"{self.graph_api_url}/{endpoint}"
             params["access_token"] = self.access_token
             
-            response = requests.request(method, url, params=params)
+            response = self.session.request(method, url, params=params)
             response.raise_for_status()
             
             return response.json()
@@ -100,6 +125,35 @@ class SocialMediaService:
             return False
         return self.publish_media(creation_id)
 
+    def share_images(self, items: List[Tuple[str, str]], max_workers: int = 8) -> List[bool]:
+        """
+        Share several images on Instagram concurrently.
+        
+        Each share still creates its container before publishing it, but
+        the round-trips of different images overlap.
+
+        The worker threads share one requests.Session. requests doesn't
+        promise that a Session is thread-safe. This relies on the calls here
+        only sending requests: urllib3's connection pool is thread-safe, the
+        cookie jar locks its own updates, and the session's headers and
+        adapters are never changed after __init__. The number of threads is
+        capped at POOL_MAXSIZE, so each one gets a pooled connection and
+        none waits on the pool.
+        
+        Args:
+            items: (image_url, caption) pairs
+            max_workers: Maximum number of shares in flight at once; at
+                most POOL_MAXSIZE
+            
+        Returns:
+            Whether each share succeeded, in the order of items
+        """
+        if not items:
+            return []
+        max_workers = min(max_workers, self.POOL_MAXSIZE, len(items))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(lambda item: self.share_image(*item), items))
+
     def verify_credentials(self) -> bool:
         """
         Verify that the provided credentials are valid.
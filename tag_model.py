@@ -1,8 +1,12 @@
 from dataclasses import dataclass, field
 from typing import Optional
 from datetime import datetime
+from functools import lru_cache
 
-@dataclass
+# Tags loaded together share timestamps; parse each string once
+_fromisoformat = lru_cache(maxsize=65536)(datetime.fromisoformat)
+
+@dataclass(slots=True)
 class TagModel:
     """
     Model representing a tag in the photo gallery system.
@@ -62,7 +66,7 @@ class TagModel:
         return cls(
             id=data['id'],
             name=data['name'],
-            created_at=datetime.fromisoformat(data['created_at']) if 'created_at' in data else datetime.now(),
+            created_at=_fromisoformat(data['created_at']) if 'created_at' in data else datetime.now(),
             description=data.get('description'),
             usage_count=data.get('usage_count', 0)
         )
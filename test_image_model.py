@@ -0,0 +1,27 @@
+import pytest
+
+PILImage = pytest.importorskip("PIL.Image")
+
+from image_model import verify_image
+
+def test_verify_image_accepts_png(tmp_path):
+    # getexif() loads PNG data, which used to make the later verify() fail
+    path = tmp_path / "photo.png"
+    PILImage.new("RGB", (8, 8), (255, 0, 0)).save(path)
+
+    assert verify_image(str(path)) == {}
+
+def test_verify_image_reads_jpeg_exif(tmp_path):
+    path = tmp_path / "photo.jpg"
+    exif = PILImage.Exif()
+    exif[0x010F] = "Camera Maker"  # Make
+    PILImage.new("RGB", (8, 8)).save(path, exif=exif)
+
+    assert verify_image(str(path))["Make"] == "Camera Maker"
+
+def test_verify_image_rejects_non_image(tmp_path):
+    path = tmp_path / "notes.png"
+    path.write_bytes(b"not an image")
+
+    with pytest.raises(Exception):
+        verify_image(str(path))
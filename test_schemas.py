@@ -0,0 +1,40 @@
+import pytest
+
+pytest.importorskip("PIL")
+
+from schemas import Image, ImageWithTags, Tag
+
+def _image():
+    return Image.from_dict({'id': 1, 'md5_checksum': 'ab', 'reference_code': 'REF-1',
+                            'imported_at': '2024-01-01T00:00:00'})
+
+def test_tags_cannot_be_mutated_in_place():
+    image = ImageWithTags(image=_image(), tags=[Tag(id=1, name='a')])
+
+    with pytest.raises(AttributeError):
+        image.tags.append(Tag(id=2, name='b'))
+
+def test_assigning_tags_reindexes_lookups():
+    a, b = Tag(id=1, name='a'), Tag(id=2, name='b')
+    image = ImageWithTags(image=_image(), tags=[a])
+
+    image.tags = [b, b]
+
+    assert image.tags == (b,)
+    assert image.has_tag('b')
+    assert not image.has_tag('a')
+
+    image.add_tag(a)
+    image.remove_tag(b)
+    assert image.tags == (a,)
+    assert image.has_tag('a')
+    assert not image.has_tag('b')
+
+def test_repeated_constructor_tags_are_removed_once():
+    a = Tag(id=1, name='a')
+    image = ImageWithTags(image=_image(), tags=[a, a])
+
+    image.remove_tag(a)
+
+    assert image.tags == ()
+    assert not image.has_tag('a')